@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Load test for the musthe query service.
+
+Starts a service in this process (or uses the one listening on --port),
+sends --requests queries from --clients concurrent keep-alive connections
+and reports the latency percentiles and the throughput. Every query is
+valid, so the run fails if any of them is answered with an error.
+
+    $ python examples/service_load_test.py --clients 32 --requests 20000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from musthe import Note
+from musthe.service import Service
+
+
+def queries(count, seed=0):
+    rng = random.Random(seed)
+    notes = [n.scientific_notation() for n in Note.all(3, 5)]
+    names = ['C', 'E', 'G', 'Bb', 'D', 'F#', 'A', 'Eb']
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            yield {'op': 'transpose',
+                   'params': {'note': rng.choice(notes),
+                              'interval': rng.choice(['m3', 'M3', 'P5'])}}
+        elif kind < 0.8:
+            yield {'op': 'chord.identify',
+                   'params': {'notes': rng.sample(names, 3)}}
+        elif kind < 0.95:
+            yield {'op': 'harmonize',
+                   'params': {'scale': rng.choice(['C major',
+                                                   'A natural_minor',
+                                                   'D dorian'])}}
+        else:
+            yield {'op': 'scale.find',
+                   'params': {'items': rng.sample(['Cm', 'Gm', 'Fm', 'Eb'],
+                                                  2)}}
+
+
+async def client(port, work, latencies, errors):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    for query in work:
+        body = json.dumps(query).encode()
+        start = time.perf_counter()
+        writer.write(b'POST /query HTTP/1.1\r\nContent-Length: ' +
+                     str(len(body)).encode() + b'\r\n\r\n' + body)
+        await writer.drain()
+        await reader.readline()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line == b'\r\n':
+                break
+            if line.lower().startswith(b'content-length:'):
+                length = int(line.split(b':')[1])
+        result = json.loads(await reader.readexactly(length))
+        latencies.append(time.perf_counter() - start)
+        if isinstance(result, dict) and 'error' in result:
+            errors.append((query, result['error']))
+    writer.close()
+
+
+def percentile(values, q):
+    return values[min(len(values) - 1, int(q / 100.0 * len(values)))]
+
+
+async def main(args):
+    service = None
+    port = args.port
+    if port is None:
+        service = Service()
+        await service.start()
+        port = service.port
+    work = list(queries(args.requests))
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, work[i::args.clients], latencies,
+                                  errors)
+                           for i in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print('{} requests in {:.2f} s ({:.0f} requests/s)'.format(
+        len(latencies), elapsed, len(latencies) / elapsed))
+    print('p50 {:.2f} ms, p99 {:.2f} ms, max {:.2f} ms'.format(
+        percentile(latencies, 50) * 1e3, percentile(latencies, 99) * 1e3,
+        latencies[-1] * 1e3))
+    if service is not None:
+        print(service.stats)
+        await service.close()
+    assert not errors, '{} queries failed, for example {}'.format(
+        len(errors), errors[0])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Load test for the musthe query service.')
+    parser.add_argument('--port', type=int,
+                        help='port of a running service (default: start one)')
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=5000)
+    asyncio.run(main(parser.parse_args()))
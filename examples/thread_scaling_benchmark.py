@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Scaling of the musthe.batch operations with the number of threads.
+
+Runs every batch operation on pools of 1, 2, 4... threads, up to the number
+of cores, and reports the throughput and the speedup over one thread. The
+speedup only goes beyond 1 on a free-threaded build of CPython:
+
+    $ python3.13t examples/thread_scaling_benchmark.py --size 20000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+from musthe import Note, Scale
+from musthe import batch
+
+
+def workloads(size, seed=0):
+    rng = random.Random(seed)
+    notes = list(Note.all(2, 6))
+    scales = [str(s) for s in Scale.all()]
+    return {
+        'transpose': (batch.transpose,
+                      ([rng.choice(notes) for _ in range(size)], 'M3')),
+        'identify': (batch.identify,
+                     ([rng.sample(notes, 4) for _ in range(size)],)),
+        'harmonize': (batch.harmonize,
+                      ([rng.choice(scales) for _ in range(size // 10)],)),
+    }
+
+
+def main(args):
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print('Python {} ({}), {} cores'.format(
+        sys.version.split()[0], 'GIL' if gil else 'free-threaded',
+        os.cpu_count()))
+    threads = [1]
+    while threads[-1] * 2 <= (args.max_threads or os.cpu_count()):
+        threads.append(threads[-1] * 2)
+    for name, (function, arguments) in workloads(args.size).items():
+        count = len(arguments[0])
+        function(*arguments, jobs=1)  # fill the caches
+        base = None
+        for jobs in threads:
+            start = time.perf_counter()
+            function(*arguments, jobs=jobs)
+            elapsed = time.perf_counter() - start
+            base = base or elapsed
+            print('{:<10} {:>3} threads: {:>10.0f} items/s, speedup {:.2f}'
+                  .format(name, jobs, count / elapsed, base / elapsed))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Scaling of musthe batch operations with threads.')
+    parser.add_argument('--size', type=int, default=10000)
+    parser.add_argument('--max-threads', type=int)
+    main(parser.parse_args())
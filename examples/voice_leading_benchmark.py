@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Throughput of VoiceLeader.lead on random progressions.
+
+Leads --count random progressions of --length chords, drawn from the
+diatonic chords of a few keys, and reports the progressions led per minute
+(the first progressions also fill the caches):
+
+    $ python examples/voice_leading_benchmark.py --count 200 --length 32
+"""
+
+import argparse
+import random
+import time
+
+from musthe import Scale
+from musthe.voice_leading import VoiceLeader
+
+
+def progressions(count, length, seed=0):
+    rng = random.Random(seed)
+    keys = [Scale('C', 'major'), Scale('G', 'major'), Scale('A', 'natural_minor'),
+            Scale('Eb', 'major')]
+    vocabularies = [[chords[0] for chords in key.harmonize(False) if chords]
+                    for key in keys]
+    for _ in range(count):
+        chords = rng.choice(vocabularies)
+        yield [rng.choice(chords) for _ in range(length)]
+
+
+def main(args):
+    work = list(progressions(args.count, args.length))
+    leader = VoiceLeader(beam=args.beam)
+    start = time.perf_counter()
+    for chords in work:
+        leader.lead(chords)
+    elapsed = time.perf_counter() - start
+    print('{} progressions of {} chords in {:.2f} s: {:.0f} per minute'
+          .format(len(work), args.length, elapsed, 60 * len(work) / elapsed))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Throughput of the voice leader.')
+    parser.add_argument('--count', type=int, default=200)
+    parser.add_argument('--length', type=int, default=32)
+    parser.add_argument('--beam', type=int)
+    main(parser.parse_args())
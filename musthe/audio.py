@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Audio rendering of notes and chords, for auditioning without a MIDI
+synthesizer.
+
+This module requires NumPy (``pip install musthe[audio]``).
+"""
+
+import wave
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .musthe import Chord, Note
+
+
+class Renderer:
+    """
+    The renderer class.
+
+    Synthesizes events into a mono signal, with a simple oscillator (one of
+    :py:attr:`Renderer.waveforms`) and a linear attack/release envelope per
+    note. An event is a (start, duration, sound) tuple, with times in
+    seconds and sound a :py:class:`Note`, a :py:class:`Chord`, a list of
+    notes or ``None`` (a rest).
+
+    The signal is computed in blocks of `block` samples, with NumPy
+    operations over whole blocks: only the notes sounding during a block
+    are kept, so rendering takes constant memory however long the events
+    stream is.
+
+    For example:
+
+        >>> r = Renderer()
+        >>> r.write('cadence.wav', r.sequence(
+        ...     [(Chord('CM'), 1), (Chord('G7'), 1), (Chord('CM'), 2)]))
+        92610
+    """
+
+    waveforms = ('sine', 'square', 'sawtooth', 'triangle')
+
+    def __init__(self, sample_rate=44100, waveform='sine', attack=0.01,
+                 release=0.1, amplitude=0.2, tuning=None, block=4096):
+        if np is None:
+            raise ImportError('Audio rendering requires NumPy')
+        if waveform not in self.waveforms:
+            raise NameError('No such waveform: {}'.format(waveform))
+        if block < 1:
+            raise ValueError('Invalid block size: {}'.format(block))
+        self.sample_rate = sample_rate
+        self.waveform = waveform
+        self.attack = max(1, int(attack * sample_rate))
+        self.release = max(1, int(release * sample_rate))
+        self.amplitude = amplitude
+        self.tuning = tuning
+        self.block = block
+
+    def _oscillator(self, phase):
+        """The waveform at `phase`, an array of fractions of a period."""
+        if self.waveform == 'sine':
+            return np.sin(2 * np.pi * phase)
+        if self.waveform == 'square':
+            return np.where(phase < 0.5, 1.0, -1.0)
+        if self.waveform == 'sawtooth':
+            return 2 * phase - 1
+        return 1 - 4 * np.abs(phase - 0.5)
+
+    @staticmethod
+    def _notes(sound):
+        if sound is None:
+            return []
+        if isinstance(sound, Note):
+            return [sound]
+        if isinstance(sound, Chord):
+            return sound.notes
+        return list(sound)
+
+    @staticmethod
+    def sequence(items, tempo=120, start=0.0):
+        """
+        Turn (sound, beats) pairs, played one after the other at `tempo`
+        beats per minute, into events.
+        """
+        beat = 60.0 / tempo
+        time = start
+        for sound, beats in items:
+            yield (time, beats * beat, sound)
+            time += beats * beat
+
+    def render(self, events):
+        """
+        Render events, sorted by start time, and yield the signal as arrays
+        of at most `block` samples, until every note has been released.
+        """
+        sr, block, release = self.sample_rate, self.block, self.release
+        events = iter(events)
+        pending = next(events, None)
+        voices = []
+        last_start = 0
+        # the sample where the last note (or rest) ends
+        tail = 0
+        b0 = 0
+        while pending is not None or b0 < tail:
+            b1 = b0 + block
+            while pending is not None and int(pending[0] * sr) < b1:
+                start, duration, sound = pending
+                start = int(start * sr)
+                if start < last_start:
+                    raise ValueError('Events are not sorted by start time')
+                last_start = start
+                end = start + int(duration * sr)
+                notes = self._notes(sound)
+                if notes:
+                    end += release
+                for note in notes:
+                    voices.append((start, end,
+                                   note.frequency(self.tuning) / sr))
+                tail = max(tail, end)
+                pending = next(events, None)
+
+            if pending is None:
+                b1 = min(b1, tail)
+            out = np.zeros(b1 - b0)
+            for start, end, step in voices:
+                lo, hi = max(b0, start), min(b1, end)
+                if lo >= hi:
+                    continue
+                i = np.arange(lo - start, hi - start, dtype=np.float64)
+                envelope = np.minimum(i / self.attack, 1.0) * \
+                    np.minimum((end - start - i) / release, 1.0)
+                out[lo - b0:hi - b0] += \
+                    envelope * self._oscillator((i * step) % 1.0)
+            voices = [v for v in voices if v[1] > b1]
+            b0 = b1
+            out *= self.amplitude
+            yield out
+
+    def write(self, filename, events):
+        """
+        Render events to a 16-bit mono WAV file, one block at a time, and
+        return the number of samples written.
+        """
+        frames = 0
+        with wave.open(filename, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(self.sample_rate)
+            for out in self.render(events):
+                samples = (np.clip(out, -1.0, 1.0) * 32767).astype('<i2')
+                f.writeframes(memoryview(samples).cast('B'))
+                frames += len(samples)
+        return frames
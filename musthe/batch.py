@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Batch operations on a pool of threads.
+
+The operations of musthe never modify the notes, intervals, chords and
+scales they are given, and objects do not share mutable state: the tables
+shared by all of them (the :py:func:`functools.lru_cache` caches of
+:py:class:`Note`, :py:class:`Chord` and :py:class:`Scale`) only hold
+immutable values, so the same objects can be read from several threads at
+once. Modifying an object (assigning to its attributes) while another
+thread uses it is not safe, nor is switching the engine (see
+:py:func:`musthe.set_engine`) while other threads run. A table may be
+computed twice when two threads need it at once, with the same result.
+
+On a free-threaded build of CPython (3.13t and later) the threads of the
+pool run in parallel; with the GIL, they only overlap.
+
+    >>> transpose(['C4', 'E4', 'G4'], 'm3', jobs=2)
+    [Note('Eb4'), Note('G4'), Note('Bb4')]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .musthe import Chord, Interval, Note, Scale
+
+
+def _apply(function, chunk):
+    return [function(item) for item in chunk]
+
+
+def _map(function, items, jobs, chunk_size):
+    """
+    Apply `function` to every item, on a pool of `jobs` threads (the
+    default size of a :py:class:`ThreadPoolExecutor` if ``None``, none if
+    1), in chunks of `chunk_size` items, and return the list of results.
+    """
+    items = list(items)
+    if jobs == 1:
+        return _apply(function, items)
+    chunks = [items[i:i + chunk_size]
+              for i in range(0, len(items), chunk_size)]
+    with ThreadPoolExecutor(jobs) as pool:
+        return [result for chunk in pool.map(partial(_apply, function), chunks)
+                for result in chunk]
+
+
+def _harmonize(include_dom7, scale):
+    if isinstance(scale, str):
+        scale = Scale(*scale.split())
+    return scale.harmonize(include_dom7)
+
+
+def _identify(k, notes):
+    return Chord.best_matches(
+        [Note(n) if isinstance(n, str) else n for n in notes], k)
+
+
+def _transpose(interval, down, note):
+    if isinstance(note, str):
+        note = Note(note)
+    return note - interval if down else note + interval
+
+
+def harmonize(scales, include_dom7=True, jobs=None, chunk_size=16):
+    """
+    Harmonize every scale (a :py:class:`Scale` or a string such as
+    ``'C major'``); see :py:meth:`Scale.harmonize`.
+    """
+    return _map(partial(_harmonize, include_dom7), scales, jobs, chunk_size)
+
+
+def identify(note_lists, k=1, jobs=None, chunk_size=64):
+    """
+    Name the chords of every list of notes (or note strings); see
+    :py:meth:`Chord.best_matches`.
+    """
+    return _map(partial(_identify, k), note_lists, jobs, chunk_size)
+
+
+def transpose(notes, interval, down=False, jobs=None, chunk_size=256):
+    """
+    Transpose every note (or note string) by `interval`, up or down if
+    `down` is true.
+    """
+    if isinstance(interval, str):
+        interval = Interval(interval)
+    return _map(partial(_transpose, interval, down), notes, jobs, chunk_size)
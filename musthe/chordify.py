@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Segmentation of polyphonic note streams into chords.
+"""
+
+from .musthe import Chord, Note
+
+
+class Chordifier:
+    """
+    The chordifier class.
+
+    Follows the notes sounding in a stream of note-on/note-off events and
+    splits the stream into harmonic regions: segments of time during which
+    the sounding pitch classes form the same chord.
+
+    The sounding pitch classes are kept as a 12-bit mask, updated on every
+    event and looked up in the table of chord masks derived from
+    :py:attr:`Chord.recipes`. Chords are only built when a segment is
+    emitted; adjacent segments with the same label are merged.
+
+    Segments are (start, end, chord) tuples, where chord is ``None`` when
+    the sounding notes do not form a known chord.
+
+    For example:
+
+        >>> c = Chordifier()
+        >>> events = [(0, Note('C4'), True), (0, Note('E4'), True),
+        ...           (0, Note('G4'), True), (2, Note('C4'), False),
+        ...           (2, Note('B3'), True), (4, Note('B3'), False)]
+        >>> list(c.feed(events)) + c.flush(4)
+        [(0, 2, Chord(Note('C4'), 'maj')), (2, 4, Chord(Note('E4'), 'min'))]
+    """
+
+    def __init__(self):
+        self.table = Chord._mask_table()
+        self.counts = [0] * 12
+        self.mask = 0
+        # spelling of the last note seen for every pitch class
+        self.spelling = [Note._from_midi(pc + 60, *spelling) for pc, spelling
+                         in enumerate(Note.default_spelling)]
+        self.lowest = None
+        self.sounding = {}
+        self.label = None
+        self.start = None
+
+    def _lookup(self):
+        matches = self.table.get(self.mask)
+        if matches is None:
+            return None
+        if len(matches) > 1 and self.lowest is not None:
+            # prefer the chord rooted on the bass
+            for match in matches:
+                if match[0] == self.lowest:
+                    return match
+        return matches[0]
+
+    def _update(self, time):
+        self.lowest = min(self.sounding) % 12 if self.sounding else None
+        label = self._lookup() if self.mask else None
+        if self.start is None:
+            self.start, self.label = time, label
+            return []
+        if label == self.label:
+            return []
+        segments = []
+        if time > self.start:
+            segments.append(self._segment(time))
+        self.start, self.label = time, label
+        return segments
+
+    def _segment(self, end):
+        chord = None
+        if self.label is not None:
+            root, chord_type = self.label
+            chord = Chord(self.spelling[root].to_octave(4), chord_type)
+        return (self.start, end, chord)
+
+    def note_on(self, note, time):
+        """
+        Start sounding `note` (a :py:class:`Note` or a MIDI number) at
+        `time`, and return the list of segments completed by this event.
+        """
+        if isinstance(note, Note):
+            midi = note.number + 12
+            self.spelling[midi % 12] = note
+        else:
+            midi = note
+        pc = midi % 12
+        self.counts[pc] += 1
+        self.mask |= 1 << pc
+        self.sounding[midi] = self.sounding.get(midi, 0) + 1
+        return self._update(time)
+
+    def note_off(self, note, time):
+        """
+        Stop sounding `note` at `time`, and return the list of segments
+        completed by this event.
+        """
+        midi = note.number + 12 if isinstance(note, Note) else note
+        count = self.sounding.get(midi, 0)
+        if count == 0:
+            raise ValueError('Note {} is not sounding'.format(note))
+        if count == 1:
+            del self.sounding[midi]
+        else:
+            self.sounding[midi] = count - 1
+        pc = midi % 12
+        self.counts[pc] -= 1
+        if self.counts[pc] == 0:
+            self.mask &= ~(1 << pc)
+        return self._update(time)
+
+    def feed(self, events):
+        """
+        Process (time, note, on) events, where `on` is ``True`` for note-on
+        events and ``False`` for note-off events, yielding segments as they
+        are completed.
+        """
+        for time, note, on in events:
+            if on:
+                segments = self.note_on(note, time)
+            else:
+                segments = self.note_off(note, time)
+            yield from segments
+
+    def flush(self, time):
+        """
+        Close the current segment at `time` and return the list of remaining
+        segments.
+        """
+        segments = []
+        if self.start is not None and time > self.start:
+            segments.append(self._segment(time))
+        self.start = time
+        return segments
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+The musthe command-line interface.
+
+Every command reads one query per line, from the files given on the
+command line or from the standard input, and writes one line of output per
+query, as soon as it is computed. Queries that fail give a line starting
+with ``error:``.
+
+    $ echo 'C4 M3' | musthe transpose
+    E4
+    $ printf 'C E G\\nD F# A C\\n' | musthe chord identify
+    Cmaj
+    Ddom7
+"""
+
+import argparse
+import fileinput
+import sys
+from functools import partial
+from multiprocessing import Pool
+
+from .musthe import Chord, Interval, Note, Scale
+
+
+def _item(token):
+    """Parse a token as a note, or else as a chord."""
+    try:
+        return Note(token)
+    except ValueError:
+        return Chord(token)
+
+
+def _fields(line, usage):
+    """Split a query into as many fields as there are in `usage`."""
+    fields = line.split()
+    if len(fields) != len(usage.split()):
+        raise ValueError('expected {!r}, got {!r}'.format(usage, line))
+    return fields
+
+
+def transpose(line, down=False):
+    note, interval = _fields(line, 'NOTE INTERVAL')
+    note, interval = Note(note), Interval(interval)
+    return (note - interval if down else note + interval).scientific_notation()
+
+
+def interval(line):
+    a, b = sorted((Note(n) for n in _fields(line, 'NOTE NOTE')),
+                  key=lambda n: n.number)
+    return str(b - a)
+
+
+def chord_parse(line):
+    return ' '.join(n.scientific_notation() for n in Chord(line).notes)
+
+
+def chord_identify(line, k=1):
+    matches = Chord.best_matches([Note(n) for n in line.split()], k)
+    return ' '.join(str(chord) for chord, _ in matches)
+
+
+def scale_contains(line, scale):
+    return 'yes' if [_item(t) for t in line.split()] in scale else 'no'
+
+
+def scale_find(line, greek_modes=False):
+    items = [_item(t) for t in line.split()]
+    return ', '.join(str(s) for s in Scale.all(greek_modes) if items in s)
+
+
+def harmonize(line, all_chords=False):
+    root, name = _fields(line, 'ROOT SCALE')
+    degrees = []
+    for chords in Scale(root, name).harmonize():
+        if not chords:
+            degrees.append('-')
+        elif all_chords:
+            degrees.append(','.join(str(c) for c in chords))
+        else:
+            degrees.append(str(chords[0]))
+    return ' '.join(degrees)
+
+
+def _run(command, line):
+    try:
+        return command(line)
+    except Exception as e:
+        return 'error: {}'.format(e)
+
+
+def _scale(text):
+    try:
+        return Scale(*text.split())
+    except (TypeError, ValueError, NameError):
+        raise argparse.ArgumentTypeError('invalid scale: {!r}'.format(text))
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='musthe', description='Music theory queries, one per line.')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='number of processes (default: 1)')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    def group(name, help):
+        p = commands.add_parser(name, help=help)
+        actions = p.add_subparsers(dest='action', metavar='action')
+        actions.required = True
+        return actions
+
+    def command(parent, name, help, function, *options):
+        """Add a command calling `function` with the given options."""
+        p = parent.add_parser(name, help=help)
+        p.set_defaults(function=function, options=options)
+        return p
+
+    def files(p):
+        p.add_argument('files', nargs='*', help='input files (default: stdin)')
+
+    p = command(commands, 'transpose',
+                "transpose a note by an interval ('C4 M3')", transpose, 'down')
+    p.add_argument('--down', action='store_true',
+                   help='transpose down instead of up')
+    files(p)
+    files(command(commands, 'interval',
+                  "name the interval between two notes ('C4 E4')", interval))
+
+    chord = group('chord', 'parse or identify chords')
+    files(command(chord, 'parse', "list the notes of a chord ('C7/E')",
+                  chord_parse))
+    p = command(chord, 'identify', "name a chord ('C E G')", chord_identify,
+                'k')
+    p.add_argument('-k', type=int, default=1,
+                   help='number of candidates (default: 1)')
+    files(p)
+
+    scale = group('scale', 'query scales')
+    p = command(scale, 'contains',
+                'tell whether notes and chords are in a scale',
+                scale_contains, 'scale')
+    p.add_argument('scale', type=_scale, help="the scale ('C major')")
+    files(p)
+    p = command(scale, 'find',
+                "find the scales containing notes and chords ('Cm Gm')",
+                scale_find, 'greek_modes')
+    p.add_argument('--greek-modes', action='store_true',
+                   help='also search the greek modes')
+    files(p)
+
+    p = command(commands, 'harmonize',
+                "list the chords of a scale ('C major')", harmonize,
+                'all_chords')
+    p.add_argument('--all', action='store_true', dest='all_chords',
+                   help='list every chord of each degree')
+    files(p)
+    return parser
+
+
+def main(argv=None):
+    """
+    Run the command given by `argv` (default: the command-line arguments),
+    and return the exit status: 1 if a query failed, 0 otherwise.
+    """
+    args = _parser().parse_args(argv)
+    options = {name: getattr(args, name) for name in args.options}
+    command = partial(_run, partial(args.function, **options))
+
+    lines = (line.strip() for line in fileinput.input(args.files or ['-']))
+    lines = (line for line in lines if line)
+    # answer queries typed on the standard input right away
+    flush = not args.files
+    errors = False
+    with Pool(args.jobs) if args.jobs > 1 else _Serial() as pool:
+        for result in pool.imap(command, lines, chunksize=64):
+            errors |= result.startswith('error:')
+            print(result, flush=flush)
+    return 1 if errors else 0
+
+
+class _Serial:
+    """A stand-in for a process pool, running everything in this process."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def imap(self, function, iterable, chunksize=1):
+        return map(function, iterable)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Statistics over a corpus of scores, computed in parallel.
+"""
+
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+from . import musicxml
+from .chordify import Chordifier
+from .keyfinder import KeyFinder
+from .musthe import Chord, Note
+
+
+extensions = ('.musicxml', '.xml', '.mxl')
+
+
+@lru_cache(maxsize=4096)
+def _interval(a, b):
+    """The name of the interval between two notes, given as strings."""
+    a, b = Note(a), Note(b)
+    if a.number > b.number:
+        a, b = b, a
+    try:
+        return str(b - a)
+    except (ValueError, ArithmeticError):
+        return None
+
+
+def intervals(events):
+    """
+    Count the melodic intervals of the top line of each part: between the
+    highest notes of consecutive onsets.
+    """
+    top = {}
+    for part, time, _, item in events:
+        if isinstance(item, Note):
+            onsets = top.setdefault(part, {})
+            if time not in onsets or item.number > onsets[time].number:
+                onsets[time] = item
+    counts = Counter()
+    for onsets in top.values():
+        line = [onsets[time] for time in sorted(onsets)]
+        for a, b in zip(line, line[1:]):
+            name = _interval(a.scientific_notation(), b.scientific_notation())
+            if name is not None:
+                counts[name] += 1
+    return counts
+
+
+def chords(events):
+    """
+    Count the types of the chords formed by the sounding notes, weighted by
+    duration (in quarter notes).
+    """
+    notes = []
+    for part, time, duration, item in events:
+        if isinstance(item, Note) and duration:
+            notes.append((time, True, item))
+            notes.append((time + duration, False, item))
+    # note-offs first, so that repeated notes are not held
+    notes.sort(key=lambda e: (e[0], e[1]))
+    chordifier = Chordifier()
+    segments = list(chordifier.feed((t, n, on) for t, on, n in notes))
+    if notes:
+        segments += chordifier.flush(notes[-1][0])
+    counts = Counter()
+    for start, end, chord in segments:
+        if chord is not None:
+            counts[chord.chord_type] += float(end - start)
+    return counts
+
+
+def chord_symbols(events):
+    """Count the types of the chord symbols."""
+    return Counter(item.chord_type for _, _, _, item in events
+                   if isinstance(item, Chord))
+
+
+def keys(events):
+    """Count the key of the piece, estimated from all of its notes."""
+    notes = [(item, float(duration)) for _, _, duration, item in events
+             if isinstance(item, Note) and duration]
+    if not notes:
+        return Counter()
+    finder = KeyFinder(window=len(notes))
+    for note, duration in notes:
+        key, _ = finder.push(note, duration)
+    return Counter() if key is None else Counter({str(key): 1})
+
+
+reducers = {
+    'intervals': intervals,
+    'chords': chords,
+    'chord_symbols': chord_symbols,
+    'keys': keys,
+}
+
+
+def _analyze(paths, names):
+    """
+    Run the reducers `names` over the files `paths`, and return their
+    merged results and the errors, by file.
+    """
+    results = {name: Counter() for name in names}
+    errors = {}
+    for path in paths:
+        try:
+            events = list(musicxml.parse(path))
+            for name in names:
+                results[name].update(reducers[name](events))
+        except Exception as e:
+            errors[path] = '{}: {}'.format(type(e).__name__, e)
+    return paths, results, errors
+
+
+class Corpus:
+    """
+    The corpus class.
+
+    Computes statistics over every score (MusicXML file, see
+    :py:data:`extensions`) under a directory. Each statistic is a reducer
+    from :py:data:`reducers`: a function from the events of a score (as
+    returned by :py:func:`musthe.musicxml.parse`) to a
+    :py:class:`collections.Counter` with string keys. Counters of
+    different scores are merged by adding them up.
+
+    Files are split into chunks of `chunk_size` scores, analyzed by a pool
+    of `jobs` processes (or in this process if `jobs` is 1). If a
+    `checkpoint` file is given, the merged results and the files analyzed
+    so far are saved to it after each chunk, and a later run with the same
+    checkpoint only analyzes the remaining files.
+
+    For example:
+
+        >>> corpus = Corpus('scores', checkpoint='scores.json')
+        >>> corpus.run()['intervals'].most_common(3)
+        [('M2', 5210), ('m2', 3144), ('P1', 2502)]
+    """
+
+    available = reducers
+
+    def __init__(self, directory, reducers=None, jobs=None, chunk_size=16,
+                 checkpoint=None):
+        if reducers is None:
+            reducers = list(self.available)
+        for name in reducers:
+            if name not in self.available:
+                raise NameError('No such reducer: {}'.format(name))
+        if chunk_size < 1:
+            raise ValueError('Invalid chunk size: {}'.format(chunk_size))
+        self.directory = directory
+        self.reducers = list(reducers)
+        self.jobs = jobs
+        self.chunk_size = chunk_size
+        self.checkpoint = checkpoint
+        self.reset()
+
+    def reset(self):
+        """Forget the results, and load them from the checkpoint if any."""
+        self.done = set()
+        self.results = {name: Counter() for name in self.reducers}
+        self.errors = {}
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return
+        with open(self.checkpoint) as f:
+            state = json.load(f)
+        if state['reducers'] != self.reducers:
+            raise ValueError('Checkpoint {} has reducers {}'.format(
+                self.checkpoint, state['reducers']))
+        self.done = set(state['done'])
+        self.results = {name: Counter(state['results'][name])
+                        for name in self.reducers}
+        self.errors = state['errors']
+
+    def _save(self):
+        state = {
+            'reducers': self.reducers,
+            'done': sorted(self.done),
+            'results': self.results,
+            'errors': self.errors,
+        }
+        temp = self.checkpoint + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp, self.checkpoint)
+
+    def files(self):
+        """Return the paths of the scores in the corpus, sorted."""
+        paths = []
+        for root, dirs, names in os.walk(self.directory):
+            for name in names:
+                if name.lower().endswith(extensions):
+                    paths.append(os.path.join(root, name))
+        return sorted(paths)
+
+    def _merge(self, paths, results, errors):
+        for name in self.reducers:
+            self.results[name].update(results[name])
+        self.errors.update(errors)
+        self.done.update(paths)
+        if self.checkpoint is not None:
+            self._save()
+
+    def run(self):
+        """
+        Analyze the files not analyzed yet, and return the results as a
+        dictionary from reducer names to counters.
+        """
+        pending = [p for p in self.files() if p not in self.done]
+        chunks = [pending[i:i + self.chunk_size]
+                  for i in range(0, len(pending), self.chunk_size)]
+        if self.jobs == 1:
+            for chunk in chunks:
+                self._merge(*_analyze(chunk, self.reducers))
+        elif chunks:
+            with ProcessPoolExecutor(self.jobs) as pool:
+                futures = [pool.submit(_analyze, chunk, self.reducers)
+                           for chunk in chunks]
+                for future in as_completed(futures):
+                    self._merge(*future.result())
+        return self.results
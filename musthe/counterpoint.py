@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Part-writing rule checking.
+
+This module requires NumPy (``pip install musthe[counterpoint]``).
+"""
+
+from numbers import Integral
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .musthe import Note, Scale
+from .sequence import NoteSequence
+from .voice_leading import VoiceLeader
+
+
+class CounterpointChecker:
+    """
+    The counterpoint checker class.
+
+    Checks aligned voices, ordered from the lowest (bass) to the highest,
+    against the rules of :py:attr:`CounterpointChecker.rules`:
+
+    * ``parallel_fifths``, ``parallel_octaves``: two voices a perfect fifth
+      (or octave, or unison), possibly compound, apart move in the same
+      direction to the same interval;
+    * ``voice_crossing``: a voice is above the next higher one;
+    * ``spacing``: two adjacent voices above the bass are more than
+      `max_spacing` semitones apart;
+    * ``range``: a voice is out of its range (SATB ranges by default, for
+      four voices; see :py:attr:`VoiceLeader.satb_ranges`);
+    * ``leading_tone``: the leading tone of `key` in an outer voice moves
+      to anything but the tonic above it (only checked if a key is given).
+
+    A voice is a list of notes (or note strings), a list of MIDI numbers
+    or a :py:class:`NoteSequence`; all voices have the same length. The
+    voices are put in one array of MIDI numbers and every rule is computed
+    with NumPy operations over all voice pairs and time steps at once.
+
+    The report maps every rule to the list of its violations, as (time,
+    voices) pairs, where time is the index of the first offending note and
+    voices a tuple of voice indices.
+
+    For example:
+
+        >>> checker = CounterpointChecker(key='C major')
+        >>> report = checker.check([['C3', 'D3'], ['G3', 'A3'], ['E4', 'F4'],
+        ...                         ['B4', 'A4']])
+        >>> report['parallel_fifths'], report['leading_tone']
+        ([(0, (0, 1))], [(0, (3,))])
+    """
+
+    rules = ('parallel_fifths', 'parallel_octaves', 'voice_crossing',
+             'spacing', 'range', 'leading_tone')
+
+    def __init__(self, voices=4, ranges=None, key=None, max_spacing=12):
+        if np is None:
+            raise ImportError('Counterpoint checking requires NumPy')
+        if ranges is None and voices == len(VoiceLeader.satb_ranges):
+            ranges = VoiceLeader.satb_ranges
+        if ranges is not None and len(ranges) != voices:
+            raise ValueError('Expected {} ranges, got {}'
+                             .format(voices, len(ranges)))
+        if isinstance(key, str):
+            key = Scale(*key.split())
+
+        self.voices = voices
+        self.ranges = None if ranges is None else np.array(
+            [[(Note(n) if isinstance(n, str) else n).midi_note() for n in r]
+             for r in ranges])
+        self.key = key
+        self.max_spacing = max_spacing
+
+    @staticmethod
+    def _midi(voice):
+        if isinstance(voice, NoteSequence):
+            return voice.midi_notes()
+        return [n if isinstance(n, Integral) else
+                (Note(n) if isinstance(n, str) else n).midi_note()
+                for n in voice]
+
+    def _array(self, voices):
+        if len(voices) != self.voices:
+            raise ValueError('Expected {} voices, got {}'
+                             .format(self.voices, len(voices)))
+        columns = [self._midi(v) for v in voices]
+        if len({len(c) for c in columns}) > 1:
+            raise ValueError('Voices have different lengths')
+        return np.array(columns, dtype=np.int16).reshape(self.voices, -1)
+
+    @staticmethod
+    def _violations(mask, voices):
+        """
+        The (time, voices) pairs where `mask`, an array of (voice group,
+        time) booleans, is true; `voices` lists the voices of each group.
+        """
+        groups, times = np.nonzero(mask)
+        return [(int(t), voices[g]) for g, t in zip(groups, times)]
+
+    def check(self, voices):
+        """Return the report of the rule violations of `voices`."""
+        m = self._array(voices)
+        report = {rule: [] for rule in self.rules}
+
+        # every pair of voices, lower first
+        lower, upper = np.triu_indices(self.voices, 1)
+        pairs = list(zip(lower.tolist(), upper.tolist()))
+        classes = np.abs(m[upper] - m[lower]) % 12
+        motion = np.sign(m[:, 1:] - m[:, :-1])
+        similar = (motion[lower] == motion[upper]) & (motion[lower] != 0)
+        for rule, interval in (('parallel_fifths', 7),
+                               ('parallel_octaves', 0)):
+            perfect = classes == interval
+            report[rule] = self._violations(
+                similar & perfect[:, :-1] & perfect[:, 1:], pairs)
+
+        adjacent = [(k, k + 1) for k in range(self.voices - 1)]
+        report['voice_crossing'] = self._violations(m[:-1] > m[1:], adjacent)
+        report['spacing'] = self._violations(
+            m[2:] - m[1:-1] > self.max_spacing, adjacent[1:])
+
+        if self.ranges is not None:
+            report['range'] = self._violations(
+                (m < self.ranges[:, :1]) | (m > self.ranges[:, 1:]),
+                [(k,) for k in range(self.voices)])
+
+        if self.key is not None:
+            leading = (self.key.root.number - 1) % 12
+            outer = sorted({0, self.voices - 1})
+            step = m[outer, 1:] - m[outer, :-1]
+            report['leading_tone'] = self._violations(
+                (m[outer, :-1] % 12 == leading) & (step != 0) & (step != 1),
+                [(k,) for k in outer])
+
+        for violations in report.values():
+            violations.sort()
+        return report
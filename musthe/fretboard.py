@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Chord voicings for fretted string instruments.
+"""
+
+from .musthe import Note
+
+
+class Fretboard:
+    """
+    The fretboard class.
+
+    A fretboard is given by the tuning of its open strings, from the lowest
+    to the highest, and its number of frets. Voicings are tuples holding the
+    fret played on every string, or ``None`` for a muted string.
+
+    For example:
+
+        >>> guitar = Fretboard()
+        >>> guitar.voicings(Chord('CM'))[0]
+        (None, 3, 2, 0, 1, 0)
+    """
+
+    tunings = {
+        'guitar':        ('E2', 'A2', 'D3', 'G3', 'B3', 'E4'),
+        'drop_d':        ('D2', 'A2', 'D3', 'G3', 'B3', 'E4'),
+        'open_g':        ('D2', 'G2', 'D3', 'G3', 'B3', 'D4'),
+        'dadgad':        ('D2', 'A2', 'D3', 'G3', 'A3', 'D4'),
+        'bass':          ('E1', 'A1', 'D2', 'G2'),
+        'ukulele':       ('G4', 'C4', 'E4', 'A4'),
+        'mandolin':      ('G3', 'D4', 'A4', 'E5'),
+    }
+
+    def __init__(self, tuning='guitar', frets=15, max_span=4, min_strings=3,
+                 inner_mutes=False):
+        if isinstance(tuning, str):
+            if tuning not in self.tunings:
+                raise NameError('No such tuning: {}'.format(tuning))
+            tuning = self.tunings[tuning]
+        self.tuning = [Note(n) if isinstance(n, str) else n for n in tuning]
+        self.open_midi = tuple(n.midi_note() for n in self.tuning)
+        self.frets = frets
+        self.max_span = max_span
+        self.min_strings = min_strings
+        self.inner_mutes = inner_mutes
+
+        # index[string][pitch class] lists the frets sounding that pitch
+        # class on that string
+        self.index = [[[] for _ in range(12)] for _ in self.open_midi]
+        for string, midi in enumerate(self.open_midi):
+            for fret in range(frets + 1):
+                self.index[string][(midi + fret) % 12].append(fret)
+
+        self._cache = {}
+
+    def positions(self, note):
+        """
+        Return the (string, fret) positions where `note` (with its octave)
+        can be played.
+        """
+        midi = note.midi_note()
+        return [(string, midi - open_midi)
+                for string, open_midi in enumerate(self.open_midi)
+                if 0 <= midi - open_midi <= self.frets]
+
+    def voicings(self, chord):
+        """
+        Return the playable voicings of `chord`, most playable first.
+
+        A voicing is playable when it contains every chord tone, at least
+        `min_strings` strings are played, the fretted notes (open strings
+        excluded) fit in `max_span` frets, and, unless `inner_mutes` is set,
+        the played strings are adjacent.
+        """
+        root = chord.notes[0].number % 12
+        pcs = frozenset(n.number % 12 for n in chord.notes)
+        key = (root, pcs)
+        voicings = self._cache.get(key)
+        if voicings is None:
+            voicings = self._search(pcs)
+            voicings.sort(key=lambda v: -self.score(v, root))
+            # threads racing to fill the same entry all get the first one
+            voicings = self._cache.setdefault(key, tuple(voicings))
+        return list(voicings)
+
+    def _search(self, pcs):
+        strings = len(self.open_midi)
+        options = [sorted(f for pc in pcs for f in self.index[s][pc])
+                   for s in range(strings)]
+        span = self.max_span - 1
+        result = []
+        chosen = []
+
+        def search(string, covered, low, high, played, ended):
+            if len(pcs) - len(covered) > strings - string:
+                return
+            if string == strings:
+                if played >= self.min_strings and len(covered) == len(pcs):
+                    result.append(tuple(chosen))
+                return
+
+            # mute this string, unless it would be a muted inner string
+            if self.inner_mutes or not played or ended:
+                chosen.append(None)
+                search(string + 1, covered, low, high, played, played > 0)
+                chosen.pop()
+
+            if ended and not self.inner_mutes:
+                return
+            for fret in options[string]:
+                if fret:
+                    if low is not None and (fret - low > span or
+                                            high - fret > span):
+                        continue
+                    new_low = fret if low is None else min(low, fret)
+                    new_high = fret if high is None else max(high, fret)
+                else:
+                    new_low, new_high = low, high
+                chosen.append(fret)
+                pc = (self.open_midi[string] + fret) % 12
+                search(string + 1, covered | {pc}, new_low, new_high,
+                       played + 1, False)
+                chosen.pop()
+
+        search(0, frozenset(), None, None, 0, False)
+        return result
+
+    def score(self, voicing, root=None):
+        """
+        Return the playability score of `voicing`: higher is easier.
+
+        More played strings, fewer fretted notes, a smaller fret span and a
+        lower position score higher, and so does having the chord root (a
+        pitch class) in the bass. Fretting more than four strings (which
+        needs a barre) is penalized.
+        """
+        fretted = [f for f in voicing if f]
+        played = [(s, f) for s, f in enumerate(voicing) if f is not None]
+        score = len(played) - 0.5 * len(fretted)
+        score -= 2 * max(0, len(fretted) - 4)
+        if fretted:
+            score -= 0.5 * (max(fretted) - min(fretted)) + 0.3 * min(fretted)
+        if root is not None and played:
+            string, fret = played[0]
+            if (self.open_midi[string] + fret) % 12 == root:
+                score += 2
+        return score
+
+    def notes(self, voicing, chord=None):
+        """
+        Return the notes sounded by `voicing`, from the lowest string up.
+
+        If `chord` is given, notes are spelled as the chord tones; other
+        notes are spelled with :py:attr:`Note.default_spelling`.
+        """
+        spelling = {}
+        if chord is not None:
+            for n in chord.notes:
+                spelling.setdefault(n.number % 12, (
+                    n.letter.idx, Note.accidental_value(n.accidental)))
+        notes = []
+        for string, fret in enumerate(voicing):
+            if fret is None:
+                continue
+            midi = self.open_midi[string] + fret
+            notes.append(Note._from_midi(midi, *spelling.get(
+                midi % 12, Note.default_spelling[midi % 12])))
+        return notes
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Streaming key detection.
+"""
+
+from collections import deque
+from math import sqrt
+
+from .musthe import Note, Scale
+
+
+class KeyFinder:
+    """
+    The key finder class.
+
+    Estimates the key of a stream of notes by correlating a histogram of the
+    pitch classes heard in a sliding window (the last `window` notes, each
+    weighted by its duration) against a profile for every root of every
+    scale in `scales`.
+
+    The histogram and its dot products with every key profile are updated
+    as notes enter and leave the window, so each note costs a constant
+    amount of work however long the stream is.
+
+    For example:
+
+        >>> kf = KeyFinder()
+        >>> for note in Scale('G', 'major')[0:8]:
+        ...     key, confidence = kf.push(note)
+        >>> key
+        Scale(Note('G4'), 'major')
+    """
+
+    # Krumhansl-Kessler key profiles, from the tonic up
+    profiles = {
+        'major': (6.35, 2.23, 3.48, 2.33, 4.38, 4.09,
+                  2.52, 5.19, 2.39, 3.66, 2.29, 2.88),
+        'natural_minor': (6.33, 2.68, 3.52, 5.38, 2.60, 3.53,
+                          2.54, 4.75, 3.98, 2.69, 3.34, 3.17),
+    }
+
+    def __init__(self, window=32, scales=('major', 'natural_minor')):
+        if window < 1:
+            raise ValueError('Invalid window size: {}'.format(window))
+        self.window = window
+        self.keys = []
+        profiles = []
+        for name in scales:
+            profile = self.profile(name)
+            for pc in range(12):
+                self.keys.append(self._spell(pc, name))
+                profiles.append([profile[(i - pc) % 12] for i in range(12)])
+
+        # weights[pc][k] is the profile value of pitch class pc in key k
+        self.weights = [[p[pc] for p in profiles] for pc in range(12)]
+        self.sum_y = [sum(p) for p in profiles]
+        self.var_y = [12 * sum(y * y for y in p) - sum(p) ** 2
+                      for p in profiles]
+        self.reset()
+
+    @classmethod
+    def profile(cls, name):
+        """
+        Return the profile of the scale `name`: the Krumhansl-Kessler
+        profile if there is one, otherwise one derived from the scale
+        intervals, weighting the tonic and the fifth above other scale tones.
+        """
+        if name in cls.profiles:
+            return cls.profiles[name]
+        if name not in Scale.scales:
+            raise NameError('No such scale: {}'.format(name))
+        profile = [0.0] * 12
+        for i in Scale._template(name):
+            profile[i.semitones % 12] = 1.0
+        profile[0] += 1.0
+        if profile[7]:
+            profile[7] += 0.5
+        return tuple(profile)
+
+    @staticmethod
+    def _spell(pc, name):
+        """
+        The scale `name` rooted at pitch class `pc`, spelled with the root
+        giving the fewest accidentals.
+        """
+        best = None
+        for root in Note.all():
+            if root.number % 12 != pc:
+                continue
+            scale = Scale(root, name)
+            accidentals = sum(len(n.accidental) for n in scale.notes)
+            if best is None or accidentals < best[0]:
+                best = (accidentals, scale)
+        return best[1]
+
+    def reset(self):
+        """Forget every note in the window."""
+        self.events = deque()
+        self.histogram = [0.0] * 12
+        self.sum_x = 0.0
+        self.sum_xx = 0.0
+        self.dots = [0.0] * len(self.keys)
+
+    def _add(self, pc, weight):
+        old = self.histogram[pc]
+        new = old + weight
+        self.histogram[pc] = new
+        self.sum_x += weight
+        self.sum_xx += new * new - old * old
+        dots = self.dots
+        for k, y in enumerate(self.weights[pc]):
+            dots[k] += weight * y
+
+    def push(self, note, duration=1.0):
+        """
+        Add a note (lasting `duration`) to the window, dropping the oldest
+        note if the window is full, and return the current estimate.
+        """
+        pc = note.number % 12
+        self.events.append((pc, duration))
+        self._add(pc, duration)
+        if len(self.events) > self.window:
+            old_pc, old_duration = self.events.popleft()
+            self._add(old_pc, -old_duration)
+        return self.estimate()
+
+    def feed(self, events):
+        """
+        Push every event of `events` (notes, or (note, duration) pairs) and
+        yield the estimate after each one.
+        """
+        for event in events:
+            if isinstance(event, Note):
+                yield self.push(event)
+            else:
+                yield self.push(*event)
+
+    def correlations(self):
+        """
+        Return the correlation of the window histogram with every key, as a
+        list of (scale, correlation) pairs, best first.
+        """
+        var_x = 12 * self.sum_xx - self.sum_x ** 2
+        if var_x <= 1e-9:
+            return []
+        result = []
+        for k, key in enumerate(self.keys):
+            r = (12 * self.dots[k] - self.sum_x * self.sum_y[k]) / \
+                sqrt(var_x * self.var_y[k])
+            result.append((key, r))
+        result.sort(key=lambda x: -x[1])
+        return result
+
+    def estimate(self):
+        """
+        Return the best key for the notes in the window and its correlation
+        as a (scale, confidence) pair, or (None, 0.0) if the window does not
+        tell keys apart (for example if it is empty).
+        """
+        var_x = 12 * self.sum_xx - self.sum_x ** 2
+        if var_x <= 1e-9:
+            return None, 0.0
+        best, best_r = None, None
+        for k in range(len(self.keys)):
+            r = (12 * self.dots[k] - self.sum_x * self.sum_y[k]) / \
+                sqrt(self.var_y[k])
+            if best_r is None or r > best_r:
+                best, best_r = k, r
+        return self.keys[best], best_r / sqrt(var_x)
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Real-time processing of MIDI note events.
+"""
+
+import asyncio
+from time import perf_counter
+
+from .musthe import Chord, Interval
+
+
+class Filter:
+    """
+    The filter class.
+
+    A filter maps every MIDI note number (0 to 127) to the tuple of note
+    numbers to play instead, computed when the filter is built, so
+    filtering an event is a table lookup. Filters compose with ``|``, from
+    left to right, into a single table:
+
+        >>> f = Transpose('P5') | ChordTrigger('min')
+        >>> f(60)
+        (67, 70, 74)
+    """
+
+    def __init__(self, table):
+        if len(table) != 128:
+            raise ValueError('A filter table needs 128 entries')
+        self.table = tuple(tuple(n for n in notes if 0 <= n < 128)
+                           for notes in table)
+
+    def __call__(self, number):
+        return self.table[number]
+
+    def __or__(self, other):
+        table = []
+        for notes in self.table:
+            out = []
+            for n in notes:
+                for m in other.table[n]:
+                    if m not in out:
+                        out.append(m)
+            table.append(out)
+        return Filter(table)
+
+
+class Transpose(Filter):
+    """Transpose notes by an interval (a string or an :py:class:`Interval`)."""
+
+    def __init__(self, interval, down=False):
+        if isinstance(interval, str):
+            interval = Interval(interval)
+        semitones = -interval.semitones if down else interval.semitones
+        super().__init__([(n + semitones,) for n in range(128)])
+
+
+class SnapToScale(Filter):
+    """
+    Move notes out of `scale` to the nearest note of the scale, the lower
+    one when both neighbors are as near.
+    """
+
+    def __init__(self, scale):
+        pcs = {n.number % 12 for n in scale.notes}
+        table = []
+        for n in range(128):
+            for d in (0, -1, 1, -2, 2):
+                if (n + d) % 12 in pcs:
+                    table.append((n + d,))
+                    break
+            else:
+                table.append((n,))
+        super().__init__(table)
+
+
+class ChordTrigger(Filter):
+    """
+    Play a chord of type `chord_type` on every note, or, if `scale` is
+    given, the diatonic chord of `tones` notes (stacked thirds) built on
+    every note of the scale; other notes are played alone.
+    """
+
+    def __init__(self, chord_type='maj', scale=None, tones=3):
+        if scale is None:
+            chord_type = Chord.aliases.get(chord_type, chord_type)
+            if chord_type not in Chord.recipes:
+                raise ValueError('Invalid chord type: {}.'.format(chord_type))
+            offsets = [semitones for _, semitones
+                       in Chord._template(chord_type, 0)]
+            super().__init__([[n + s for s in offsets] for n in range(128)])
+            return
+        root = scale.root.number % 12
+        steps = [i.semitones for i in scale.intervals]
+        degrees = {}
+        for k, s in enumerate(steps):
+            offsets = []
+            for t in range(tones):
+                octaves, j = divmod(k + 2 * t, len(steps))
+                offsets.append(steps[j] + 12 * octaves - s)
+            degrees[(root + s) % 12] = offsets
+        super().__init__([[n + s for s in degrees.get(n % 12, (0,))]
+                          for n in range(128)])
+
+
+class LatencyHistogram:
+    """
+    The latency histogram class.
+
+    Counts latencies in buckets whose upper bounds double from 1 µs up to
+    about 1 s (see :py:attr:`bounds`, in seconds); recording a latency
+    costs one bit-length computation.
+    """
+
+    bounds = [2 ** k / 1e6 for k in range(21)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0
+        self.max = 0.0
+
+    def add(self, seconds):
+        micros = int(seconds * 1e6)
+        k = micros.bit_length() if micros > 0 else 0
+        self.counts[min(k, len(self.bounds))] += 1
+        self.total += 1
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q):
+        """
+        Return the upper bound of the bucket holding the `q`-th percentile
+        (from 0 to 100) of the latencies, in seconds, or ``None`` if there
+        are none.
+        """
+        if not self.total:
+            return None
+        rank = q / 100.0 * self.total
+        seen = 0
+        for k, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return self.bounds[k] if k < len(self.bounds) else self.max
+        return self.max
+
+
+class LoopbackPort:
+    """
+    The loopback port class.
+
+    An in-memory port: messages sent to it can be received from it, in
+    order. The ``receive`` coroutine of a port returns a (message,
+    timestamp) pair, where timestamp is the :py:func:`time.perf_counter`
+    time at which the message arrived, or ``None`` once the port is
+    closed. Any object with the same methods, such as a wrapper around a
+    MIDI library, can be used by a :py:class:`Processor`.
+    """
+
+    def __init__(self):
+        self.queue = asyncio.Queue()
+
+    async def send(self, message):
+        self.queue.put_nowait((message, perf_counter()))
+
+    async def receive(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.queue.put_nowait(None)
+
+
+class Processor:
+    """
+    The processor class.
+
+    Reads MIDI messages, given as (status, data1, data2) tuples of
+    integers, from the `input` port, passes note-on and note-off messages
+    through `filter` and writes the result to the `output` port. Other
+    messages are forwarded unchanged. The time from the arrival of every
+    message to the sending of its output is recorded in
+    :py:attr:`latency`.
+
+    When several input notes map to the same output note, the output note
+    is only turned off when all of them are released.
+
+    For example:
+
+        >>> async def main():
+        ...     inp, out = LoopbackPort(), LoopbackPort()
+        ...     processor = Processor(Transpose('M3'), inp, out)
+        ...     await inp.send((0x90, 60, 100))
+        ...     inp.close()
+        ...     await processor.run()
+        ...     return await out.receive()
+        >>> asyncio.run(main())[0]
+        (144, 64, 100)
+    """
+
+    def __init__(self, filter, input, output):
+        self.filter = filter
+        self.input = input
+        self.output = output
+        self.latency = LatencyHistogram()
+        # sounding[channel][note] counts the input notes holding an output
+        self.sounding = [[0] * 128 for _ in range(16)]
+
+    def process(self, message):
+        """Return the list of messages to send for `message`."""
+        status = message[0]
+        kind = status & 0xf0
+        if kind != 0x90 and kind != 0x80:
+            return [message]
+        _, note, velocity = message
+        channel = status & 0x0f
+        if kind == 0x90 and velocity > 0:
+            sounding = self.sounding[channel]
+            out = []
+            for n in self.filter.table[note]:
+                sounding[n] += 1
+                if sounding[n] == 1:
+                    out.append((status, n, velocity))
+            return out
+        sounding = self.sounding[channel]
+        out = []
+        for n in self.filter.table[note]:
+            if sounding[n] > 0:
+                sounding[n] -= 1
+                if sounding[n] == 0:
+                    out.append((status, n, velocity))
+        return out
+
+    async def run(self):
+        """
+        Process messages until the input port is closed, then close the
+        output port.
+        """
+        process, send, add = self.process, self.output.send, self.latency.add
+        while True:
+            item = await self.input.receive()
+            if item is None:
+                break
+            message, timestamp = item
+            for out in process(message):
+                await send(out)
+            add(perf_counter() - timestamp)
+        self.output.close()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Markov models of melodies and chord progressions.
+"""
+
+import random
+from bisect import bisect_right
+from collections import Counter
+from itertools import accumulate, count, repeat
+
+from .musthe import Chord, Scale
+from .sequence import NoteSequence
+
+
+class MarkovModel:
+    """
+    The Markov model class.
+
+    An n-gram model over hashable symbols: the next symbol is drawn given
+    the last `order` ones, backing off to shorter contexts when a context
+    was never seen in training. Transition counts are compiled into
+    cumulative weight tables on first use, so each draw is a bisection.
+    A trained model can be sampled from several threads at once (with one
+    random generator per thread), but must not be trained meanwhile.
+
+    For example:
+
+        >>> m = MarkovModel(order=1)
+        >>> m.train(['abab', 'abb'])
+        >>> ''.join(m.walk(random.Random(1), 6))
+        'abbaba'
+    """
+
+    def __init__(self, order=1):
+        if order < 0:
+            raise ValueError('Invalid order: {}'.format(order))
+        self.order = order
+        # counts[context] counts the symbols following the context, for
+        # contexts of every length up to the order
+        self.counts = {}
+        self.tables = {}
+
+    def train(self, sequences):
+        """Count the transitions of every sequence of symbols."""
+        for sequence in sequences:
+            history = (None,) * self.order
+            for symbol in sequence:
+                for n in range(self.order + 1):
+                    context = history[self.order - n:]
+                    self.counts.setdefault(context, Counter())[symbol] += 1
+                history = (history + (symbol,))[1:] if self.order else ()
+        self.tables = {}
+
+    def _table(self, context):
+        """The symbols following `context` and their cumulative weights."""
+        table = self.tables.get(context)
+        if table is None:
+            counts = self.counts[context]
+            symbols = list(counts)
+            table = self.tables.setdefault(
+                context,
+                (symbols, list(accumulate(counts[s] for s in symbols))))
+        return table
+
+    def walk(self, rng, length, start=()):
+        """
+        Yield `length` symbols (or endlessly, if `length` is ``None``)
+        drawn with the random generator `rng`, after the symbols `start`
+        (not yielded).
+        """
+        if not self.counts:
+            raise ValueError('The model has not been trained')
+        history = ((None,) * self.order + tuple(start))[
+            len(start):] if self.order else ()
+        for _ in (count() if length is None else repeat(None, length)):
+            for n in range(self.order, -1, -1):
+                context = history[self.order - n:]
+                if context in self.counts:
+                    break
+            symbols, cumulative = self._table(context)
+            symbol = symbols[bisect_right(cumulative,
+                                          rng.random() * cumulative[-1])]
+            yield symbol
+            if self.order:
+                history = history[1:] + (symbol,)
+
+
+def _key(key):
+    return Scale(*key.split()) if isinstance(key, str) else key
+
+
+def _degree(tonic, note):
+    """
+    The position of `note` relative to `tonic`, as (letter steps,
+    semitones), so that ``tonic._shift(*position)`` is `note` again.
+    """
+    steps = note.letter.idx + 7 * note.octave - \
+        tonic.letter.idx - 7 * tonic.octave
+    return steps, note.number - tonic.number
+
+
+class MelodyModel(MarkovModel):
+    """
+    The melody model class.
+
+    A :py:class:`MarkovModel` of melodies, independent of their key: every
+    note is a symbol of its position relative to the tonic (in letters and
+    semitones, so the spelling is kept) and its duration.
+
+    For example:
+
+        >>> m = MelodyModel(order=2)
+        >>> m.train([('C major', [Note('C4'), Note('D4'), Note('E4')])])
+        >>> next(m.generate('G major', 3, seed=0)).to_notes()
+        [Note('G4'), Note('A4'), Note('B4')]
+    """
+
+    def train(self, melodies):
+        """
+        Train on (key, melody) pairs, where key is a :py:class:`Scale` (or
+        a string such as ``'C major'``) and melody is a
+        :py:class:`NoteSequence` or a list of notes.
+        """
+        def symbols():
+            for key, melody in melodies:
+                tonic = _key(key).root.to_octave(4)
+                if isinstance(melody, NoteSequence):
+                    durations = melody.duration
+                else:
+                    durations = None
+                yield [_degree(tonic, note) +
+                       (1.0 if durations is None else durations[k],)
+                       for k, note in enumerate(melody)]
+
+        super().train(symbols())
+
+    def generate(self, key, length, count=None, seed=None):
+        """
+        Yield `count` melodies (or as many as iterated over, if `count` is
+        ``None``) of `length` notes in `key`, as :py:class:`NoteSequence`
+        objects with onsets and durations. The same `seed` gives the same
+        melodies.
+        """
+        rng = random.Random(seed)
+        tonic = _key(key).root.to_octave(4)
+        notes = {}
+        n = 0
+        while count is None or n < count:
+            melody, onsets, durations = [], [], []
+            time = 0.0
+            for steps, semitones, duration in self.walk(rng, length):
+                note = notes.get((steps, semitones))
+                if note is None:
+                    note = notes[steps, semitones] = \
+                        tonic._shift(steps, semitones)
+                melody.append(note)
+                onsets.append(time)
+                durations.append(duration)
+                time += duration
+            yield NoteSequence.from_notes(melody, onsets, durations)
+            n += 1
+
+
+class ProgressionModel(MarkovModel):
+    """
+    The chord progression model class.
+
+    A :py:class:`MarkovModel` of chord progressions, independent of their
+    key: every chord is a symbol of the position of its root relative to
+    the tonic and its type.
+
+    For example:
+
+        >>> m = ProgressionModel()
+        >>> m.train([('C major', [Chord('CM'), Chord('FM'), Chord('G7')])])
+        >>> [str(c) for c in m.generate('D major', 3, seed=0)]
+        ['Dmaj', 'Gmaj', 'Adom7']
+    """
+
+    def train(self, progressions):
+        """Train on (key, chords) pairs."""
+        def symbols():
+            for key, chords in progressions:
+                tonic = _key(key).root
+                yield [((c.root.letter.idx - tonic.letter.idx) % 7,
+                        (c.root.number - tonic.number) % 12, c.chord_type)
+                       for c in chords]
+
+        super().train(symbols())
+
+    def generate(self, key, length=None, seed=None):
+        """
+        Yield `length` chords (or as many as iterated over, if `length` is
+        ``None``) in `key`. The same `seed` gives the same chords.
+        """
+        rng = random.Random(seed)
+        tonic = _key(key).root.to_octave(4)
+        chords = {}
+        for symbol in self.walk(rng, length):
+            chord = chords.get(symbol)
+            if chord is None:
+                steps, semitones, chord_type = symbol
+                root = tonic._shift(steps, semitones)
+                chord = chords[symbol] = Chord(root.to_octave(4), chord_type)
+            yield chord
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Streaming import of MusicXML scores.
+"""
+
+import zipfile
+from fractions import Fraction
+from xml.etree.ElementTree import iterparse
+
+from .musthe import Chord, Letter, Note
+
+
+# MusicXML harmony kinds with a musthe chord type
+harmony_kinds = {
+    'major': 'maj',
+    'minor': 'min',
+    'augmented': 'aug',
+    'diminished': 'dim',
+    'dominant': 'dom7',
+    'major-seventh': 'maj7',
+    'minor-seventh': 'min7',
+    'diminished-seventh': 'dim7',
+    'augmented-seventh': 'aug7',
+    'half-diminished': 'm7dim5',
+    'dominant-ninth': 'dom9',
+    'major-ninth': 'maj9',
+    'minor-ninth': 'min9',
+    'suspended-second': 'sus2',
+    'suspended-fourth': 'sus4',
+    'power': 'open5',
+}
+
+
+def _score_path(archive, source):
+    """The path of the score in an open .mxl (compressed MusicXML) file."""
+    with archive.open('META-INF/container.xml') as f:
+        for _, elem in iterparse(f):
+            if elem.tag.rpartition('}')[2] == 'rootfile' and \
+                    elem.get('full-path'):
+                return elem.get('full-path')
+    raise ValueError('No score in {}'.format(source))
+
+
+def _int(elem, path, default=0):
+    text = elem.findtext(path)
+    if text is None or not text.strip():
+        return default
+    return int(round(float(text)))
+
+
+def _note(step, alter, octave):
+    if step not in Letter.letters_idx:
+        raise ValueError('Invalid step: {!r}'.format(step))
+    return Note._from_spelling(Letter.letters_idx[step], alter, octave)
+
+
+def parse(source):
+    """
+    Read a partwise MusicXML score (a file name or a file object; file
+    names ending with ``.mxl`` are read as compressed MusicXML) and yield
+    its contents, in document order, as (part, time, duration, item)
+    tuples, where:
+
+    * part is the part id,
+    * time and duration are fractions of quarter notes, from the start of
+      the part,
+    * item is a :py:class:`Note`, ``None`` for a rest, or a
+      :py:class:`Chord` for a chord symbol (with a duration of ``None``).
+
+    Notes of a chord have the same time. Tied notes are yielded separately,
+    and chord symbols whose kind has no musthe chord type (see
+    :py:data:`harmony_kinds`) are skipped.
+
+    The score is parsed with :py:func:`xml.etree.ElementTree.iterparse`,
+    and every measure is discarded once it has been read, so memory use
+    does not grow with the length of the score.
+
+    For example:
+
+        >>> for part, time, duration, item in parse('score.musicxml'):
+        ...     print(part, time, duration, item)
+        P1 0 1 C
+        P1 1 1 E
+    """
+    if isinstance(source, str) and source.lower().endswith('.mxl'):
+        # the score is decompressed as it is parsed
+        with zipfile.ZipFile(source) as archive, \
+                archive.open(_score_path(archive, source)) as f:
+            yield from parse(f)
+        return
+
+    stack = []
+    part = None
+    divisions = 1
+    time = Fraction(0)
+    last = Fraction(0)
+    for event, elem in iterparse(source, events=('start', 'end')):
+        tag = elem.tag.rpartition('}')[2]
+        if event == 'start':
+            if not stack and tag != 'score-partwise':
+                raise ValueError('Not a partwise MusicXML score: {}'.format(
+                    tag))
+            if tag == 'part':
+                part = elem.get('id')
+                divisions, time, last = 1, Fraction(0), Fraction(0)
+            stack.append(elem)
+            continue
+        stack.pop()
+
+        if tag == 'divisions':
+            divisions = int(elem.text)
+        elif tag == 'note':
+            duration = Fraction(_int(elem, 'duration'), divisions)
+            if elem.find('chord') is not None:
+                start = last
+            else:
+                start = time
+                time += duration
+            last = start
+            if elem.find('rest') is not None:
+                yield (part, start, duration, None)
+            else:
+                pitch = elem.find('pitch')
+                if pitch is not None:
+                    note = _note(pitch.findtext('step'),
+                                 _int(pitch, 'alter'), _int(pitch, 'octave'))
+                    yield (part, start, duration, note)
+        elif tag == 'backup':
+            time -= Fraction(_int(elem, 'duration'), divisions)
+        elif tag == 'forward':
+            time += Fraction(_int(elem, 'duration'), divisions)
+        elif tag == 'harmony':
+            chord_type = harmony_kinds.get(elem.findtext('kind', '').strip())
+            root = elem.find('root')
+            if chord_type is not None and root is not None:
+                bass = elem.find('bass')
+                if bass is not None:
+                    bass = _note(bass.findtext('bass-step'),
+                                 _int(bass, 'bass-alter'), 4)
+                root = _note(root.findtext('root-step'),
+                             _int(root, 'root-alter'), 4)
+                offset = Fraction(_int(elem, 'offset'), divisions)
+                yield (part, time + offset, None,
+                       Chord(root, chord_type, bass=bass))
+        elif tag == 'measure':
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
@@ -7,7 +7,12 @@ Gonzalo Ciruelos <gonzalo.ciruelos@gmail.com>
 Federico Ferri <federico.ferri.it@gmail.com>
 """
 
+import os
 import re
+from bisect import bisect_left
+from copy import copy
+from functools import lru_cache
+from math import log2
 from typing import List, Union
 
 
@@ -21,6 +26,35 @@ def UnsupportedOperands(op, type1, type2):
     return TypeError(fmt.format(op, type1.__name__, type2.__name__))
 
 
+"""The implementations of note arithmetic, chord spelling and scale
+harmonization: 'reference' is the original one, going through interval and
+note strings; 'accelerated' works on letter indices and semitones, with
+cached templates. Both give the same results (see :py:mod:`musthe.verify`).
+"""
+engines = ('accelerated', 'reference')
+
+_reference = False
+
+
+def set_engine(name):
+    """
+    Select the implementation used from now on, one of :py:data:`engines`.
+    The engine is global to the process: switching it while other threads
+    use musthe is not thread safe.
+    """
+    global _reference
+    if name not in engines:
+        raise NameError('No such engine: {}'.format(name))
+    _reference = name == 'reference'
+
+
+def get_engine():
+    return 'reference' if _reference else 'accelerated'
+
+
+set_engine(os.environ.get('MUSTHE_ENGINE', 'accelerated'))
+
+
 class Letter:
     """
     The letter class.
@@ -100,17 +134,45 @@ class Note:
 
     pattern = re.compile(r'([A-G])(b{0,3}|#{0,3})(\d{0,1})$')
 
+    # (letter index, accidental) used to spell a bare pitch class: sharps,
+    # except for Eb and Bb
+    default_spelling = [(0, 0), (0, 1), (1, 0), (2, -1), (2, 0), (3, 0),
+                        (3, 1), (4, 0), (4, 1), (5, 0), (6, -1), (6, 0)]
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _catalog(accidentals=None):
+        """
+        The (letter index, accidental value) of the notes of one octave of
+        :py:meth:`all`, in order, keeping only the accidentals in
+        `accidentals` (a frozenset of strings) if given.
+        """
+        catalog = []
+        for letter in Letter.all():
+            letter_accidentals = ['']
+            if letter.has_flat():
+                letter_accidentals.insert(0, 'b')
+            if letter.has_sharp():
+                letter_accidentals.append('#')
+            for acc in letter_accidentals:
+                if accidentals is None or acc in accidentals:
+                    catalog.append((letter.idx, Note.accidental_value(acc)))
+        return tuple(catalog)
+
     @staticmethod
-    def all(min_octave=4, max_octave=4):
+    def all(min_octave=4, max_octave=4, accidentals=None):
+        """
+        Yield the natural, flat and sharp notes from `min_octave` to
+        `max_octave`, or only those whose accidental is in `accidentals`
+        (for example ``('', '#')``), in ascending order of octave and
+        letter.
+        """
+        if accidentals is not None:
+            accidentals = frozenset(accidentals)
+        catalog = Note._catalog(accidentals)
         for octave in range(min_octave, max_octave + 1):
-            for letter in Letter.all():
-                letter_accidentals = ['']
-                if letter.has_flat():
-                    letter_accidentals.insert(0, 'b')
-                if letter.has_sharp():
-                    letter_accidentals.append('#')
-                for acc in letter_accidentals:
-                    yield Note('{}{}{:d}'.format(letter.name, acc, octave))
+            for letter_idx, acc in catalog:
+                yield Note._from_spelling(letter_idx, acc, octave)
 
     @staticmethod
     def accidental_value(acc):
@@ -122,6 +184,37 @@ class Note:
     def accidental_str(val):
         return 'b' * max(0, -val) + '#' * max(0, val)
 
+    @staticmethod
+    def _from_spelling(letter_idx, accidental, octave):
+        """
+        Build a note from its letter index, accidental value and octave,
+        without going through string parsing.
+        """
+        if not -3 <= accidental <= 3 or not 0 <= octave <= 9:
+            raise ValueError('Could not parse the note {!r}'.format(
+                Letter.letters[letter_idx] +
+                Note.accidental_str(accidental) + str(octave)))
+        note = Note.__new__(Note)
+        note.letter = Letter(Letter.letters[letter_idx])
+        note.accidental = Note.accidental_str(accidental)
+        note.octave = octave
+        note.number = note.letter.number() + octave * 12 + accidental
+        return note
+
+    @staticmethod
+    def _from_midi(midi, letter_idx, accidental):
+        """
+        Build the note with MIDI number `midi` spelled with the given letter
+        index and accidental value.
+        """
+        natural = Letter.letters_number[Letter.letters[letter_idx]]
+        octave, rest = divmod(midi - 12 - natural - accidental, 12)
+        if rest:
+            raise ValueError('MIDI note {} cannot be spelled as {}'.format(
+                midi, Letter.letters[letter_idx] +
+                Note.accidental_str(accidental)))
+        return Note._from_spelling(letter_idx, accidental, octave)
+
     def __init__(self, note):
         m = self.pattern.match(note)
         if m is None:
@@ -135,7 +228,9 @@ class Note:
             Note.accidental_value(self.accidental)
 
     def __add__(self, other):
-        if isinstance(other, Interval):
+        if isinstance(other, Interval) and not _reference:
+            return self._shift(other.number - 1, other.semitones)
+        elif isinstance(other, Interval):
             if other.is_compound():
                 from functools import reduce
                 return reduce(lambda a, b: a + b, other.split(), self)
@@ -155,7 +250,28 @@ class Note:
             raise UnsupportedOperands('+', self, other)
 
     def __sub__(self, other):
-        if isinstance(other, Interval):
+        if isinstance(other, Interval) and not _reference:
+            # as the reference subtraction, which goes through the note an
+            # octave below for every octave of the interval, fail in the
+            # lowest octaves
+            octaves = 1 + max(0, (other.number - 2) // 7)
+            if self.octave < octaves:
+                raise ValueError('Could not parse the note {!r}'.format(
+                    self.letter.name + self.accidental + '-1'))
+            return self._shift(1 - other.number, -other.semitones)
+        elif isinstance(other, Note) and not _reference:
+            semitones = self.number - other.number
+            if semitones < -1:
+                raise ArithmeticError('Interval smaller than d1')
+            octaves = 0
+            if semitones >= 12:
+                octaves, semitones = divmod(semitones, 12)
+            number = (self.letter.idx - other.letter.idx) % 7 + 1
+            quality = Interval._qualities().get((number, semitones))
+            if quality is None:
+                raise ValueError('Interval N={} S={}'.format(number, semitones))
+            return Interval(quality + str(octaves * 7 + number))
+        elif isinstance(other, Interval):
             if other.is_compound():
                 from functools import reduce
                 return reduce(lambda a, b: a - b, other.split(), self)
@@ -179,12 +295,115 @@ class Note:
         else:
             raise UnsupportedOperands('-', self, other)
 
+    def _shift(self, steps, semitones):
+        """
+        Transpose by `steps` letters and `semitones` semitones, spelling the
+        result the same way as adding the corresponding interval does.
+        """
+        idx = self.letter.idx + steps
+        new_letter = Letter.letters[idx % 7]
+        difference = (self.number + semitones) % 12 - \
+            Letter.letters_number[new_letter]
+        if difference < -3:
+            difference += 12
+        if difference > 3:
+            difference -= 12
+        return Note._from_spelling(idx % 7, difference, self.octave + idx // 7)
+
     def midi_note(self):
         return self.number + 12
 
-    def frequency(self):
-        from math import pow
-        return 440.0 * pow(2, (self.number - Note('A4').number) / 12.)
+    def frequency(self, tuning=None):
+        if tuning is not None:
+            return tuning.frequency(self)
+        return 440.0 * 2 ** ((self.number - 57) / 12.)
+
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def _frequency_boundaries(a4):
+        """
+        The frequencies halfway (geometrically) between consecutive notes,
+        from C0 up to B9, with A4 tuned to `a4` Hz.
+        """
+        return tuple(a4 * 2 ** ((midi + 0.5 - 69) / 12.)
+                     for midi in range(12, 131))
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _key_spelling(key):
+        """
+        The (letter index, accidental) spelling of every pitch class in the
+        key `key` (a (root, scale name) pair), or the default spelling.
+        """
+        if key is None:
+            return tuple(Note.default_spelling)
+        scale = Scale(*key)
+        flats = any('b' in n.accidental for n in scale.notes)
+        spelling = []
+        for pc in range(12):
+            letter_idx, acc = Note.default_spelling[pc]
+            if flats and acc > 0:
+                letter_idx, acc = (letter_idx + 1) % 7, -1
+            spelling.append((letter_idx, acc))
+        for n in scale.notes:
+            spelling[n.number % 12] = (n.letter.idx,
+                                       Note.accidental_value(n.accidental))
+        return tuple(spelling)
+
+    @staticmethod
+    def from_frequency(frequency, a4=440.0, key=None):
+        """
+        Find the note nearest to a frequency.
+
+        Args:
+            frequency (float): The frequency, in Hz.
+            a4 (float, optional): The frequency of A4. Defaults to 440.
+            key (Scale, optional): If given, notes are spelled as in this
+                scale, and other notes with sharps or flats following its
+                key signature. Defaults to sharps (except for Eb and Bb).
+
+        Returns:
+            Tuple[Note, float]: The nearest note (from C0 to B9) and the
+                deviation of `frequency` from it, in cents; ``None`` if the
+                frequency is not positive.
+
+        Examples:
+            >>> Note.from_frequency(445.0)
+            (Note('A4'), 19.56...)
+        """
+        return Note.from_frequencies([frequency], a4, key)[0]
+
+    @staticmethod
+    def from_frequencies(frequencies, a4=440.0, key=None):
+        """
+        Find the nearest note to every frequency of a sequence, for instance
+        the frames of a pitch track; see :py:meth:`from_frequency`.
+
+        Notes are found by bisection in a table of frequencies computed once
+        per A4 reference, and unvoiced frames (frequencies that are not
+        positive, or NaN) give ``None``.
+        """
+        boundaries = Note._frequency_boundaries(float(a4))
+        spelling = Note._key_spelling(
+            None if key is None else (str(key.root), key.name))
+        notes = {}
+        result = []
+        for f in frequencies:
+            if not f > 0:
+                result.append(None)
+                continue
+            midi = bisect_left(boundaries, f) + 12
+            note = notes.get(midi)
+            if note is None:
+                try:
+                    note = Note._from_midi(midi, *spelling[midi % 12])
+                except ValueError:
+                    note = Note._from_midi(
+                        midi, *Note.default_spelling[midi % 12])
+                notes[midi] = note
+            cents = 1200 * log2(f / a4) - 100 * (midi - 69)
+            result.append((note, cents))
+        return result
 
     def to_octave(self, octave):
         return Note(self.letter.name + self.accidental + str(octave))
@@ -239,6 +458,31 @@ class Interval:
         for name in Interval.intervals:
             yield Interval(name)
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _qualities():
+        """
+        Map (number, semitones) to the quality of the first simple interval
+        of :py:meth:`all` with that number and size.
+        """
+        qualities = {}
+        for i in Interval.all():
+            qualities.setdefault((i.number, i.semitones), i.quality)
+        return qualities
+
+    @staticmethod
+    def _from_steps(steps, semitones):
+        """
+        The interval spanning `steps` letters and `semitones` semitones
+        upwards.
+        """
+        octaves = steps // 7
+        quality = Interval._qualities().get((steps % 7 + 1,
+                                             semitones - 12 * octaves))
+        if quality is None:
+            raise ValueError('Interval N={} S={}'.format(steps + 1, semitones))
+        return Interval(quality + str(steps + 1))
+
     def __init__(self, interval):
         self.quality = interval[0]
         self.number = int(interval[1:])
@@ -359,43 +603,370 @@ class Chord:
 
     valid_types = list(recipes.keys()) + list(aliases.keys())
 
+    """Neo-Riemannian transformations of major and minor triads: maps the
+    chord type and the transformation to the interval from the old root to
+    the new one and the new chord type. P, L and R are the parallel,
+    leading-tone exchange and relative transformations; N (RLP), S (LPR)
+    and H (LPL) are the Nebenverwandt, slide and hexatonic pole.
+    """
+    neo_riemannian = {
+        ('maj', 'P'): ('P1', 'min'), ('min', 'P'): ('P1', 'maj'),
+        ('maj', 'L'): ('M3', 'min'), ('min', 'L'): ('m6', 'maj'),
+        ('maj', 'R'): ('M6', 'min'), ('min', 'R'): ('m3', 'maj'),
+        ('maj', 'N'): ('P4', 'min'), ('min', 'N'): ('P5', 'maj'),
+        ('maj', 'S'): ('A1', 'min'), ('min', 'S'): ('d1', 'maj'),
+        ('maj', 'H'): ('m6', 'min'), ('min', 'H'): ('M3', 'maj'),
+    }
+
     @staticmethod
-    def all(min_octave=4, max_octave=4, root=None):
+    def all(min_octave=None, max_octave=None, root=None, chord_types=None,
+            accidentals=None):
+        """
+        Yield the chords of every type in `chord_types` (every type in
+        :py:attr:`recipes` by default) on every root, root by root.
+
+        The roots are the notes of :py:meth:`Note.all` from `min_octave` to
+        `max_octave` (octave 4 by default) with the given `accidentals`,
+        or the notes in `root` (a note or a list of notes): as they are, or
+        moved to every octave of the range if one is given. Chords with
+        notes beyond octave 9 are skipped.
+
+        The notes of a chord are spelled once per root spelling and chord
+        type, and only shifted by whole octaves for every root.
+        """
         if root is None:
-            roots = Note.all()
-        elif isinstance(root, (list, set, tuple)):
-            roots = root
-        elif isinstance(root, Note):
-            roots = [root]
+            catalog = Note._catalog(
+                None if accidentals is None else frozenset(accidentals))
+            roots = ((letter_idx, acc, octave) for octave in range(
+                4 if min_octave is None else min_octave,
+                (4 if max_octave is None else max_octave) + 1)
+                for letter_idx, acc in catalog)
         else:
-            raise TypeError('Invalid root type: {}'.format(type(root)))
-        for root in roots:
-            for name in Chord.recipes:
-                yield Chord(root, name)
-
-    def __init__(self, root, chord_type='M'):
+            if isinstance(root, Note):
+                root = [root]
+            elif not isinstance(root, (list, set, tuple)):
+                raise TypeError('Invalid root type: {}'.format(type(root)))
+            if min_octave is None and max_octave is None:
+                octaves = None
+            else:
+                octaves = range(4 if min_octave is None else min_octave,
+                                (4 if max_octave is None else max_octave) + 1)
+            roots = ((r.letter.idx, Note.accidental_value(r.accidental),
+                      octave) for r in root
+                     for octave in (octaves or [r.octave]))
+
+        if chord_types is None:
+            chord_types = list(Chord.recipes)
+        else:
+            chord_types = [Chord.aliases.get(t, t) for t in chord_types]
+            for t in chord_types:
+                if t not in Chord.recipes:
+                    raise ValueError('Invalid chord type: {}.'.format(t))
+
+        for letter_idx, acc, octave in roots:
+            for name in chord_types:
+                spelling = Chord._spelling(letter_idx, acc, name)
+                if octave + max(o for _, _, o in spelling) > 9:
+                    continue
+                if _reference:
+                    yield Chord(Note._from_spelling(letter_idx, acc, octave),
+                                name)
+                    continue
+                chord = Chord.__new__(Chord)
+                chord.notes = [Note._from_spelling(l, a, octave + o)
+                               for l, a, o in spelling]
+                chord.root = chord.notes[0]
+                chord.chord_type = name
+                chord.bass = None
+                chord.inversion = 0
+                yield chord
+
+    def __init__(self, root, chord_type='M', bass=None, inversion=0):
         if isinstance(root, str):
+            name, slash, bass_name = root.partition('/')
+            if slash:
+                bass = bass_name
             for s in sorted(self.valid_types, key=lambda x: -len(x)):
-                if root.endswith(s):
+                if name.endswith(s):
                     chord_type = s
-                    root = Note(root[:-len(s)])
+                    root = Note(name[:-len(s)])
                     break
             if not isinstance(root, Note):
-                raise ValueError('Invalid chord: {!r}'.format(root))
+                # a bare root is a major chord, but not with an octave:
+                # 'C5' would read as a power chord
+                m = Note.pattern.match(name)
+                if m is None:
+                    raise ValueError('Invalid chord: {!r}'.format(root))
+                if m.group(3):
+                    raise ValueError(
+                        'Invalid chord: {!r}: give the chord type of a root '
+                        'with an octave, such as {!r}'.format(
+                            root, name + 'maj'))
+                root = Note(name)
 
         if chord_type in self.aliases:
             chord_type = self.aliases[chord_type]
         if chord_type not in self.recipes.keys():
             raise ValueError('Invalid chord type: {}.'.format(chord_type))
 
+        self.root = root
         self.chord_type = chord_type
-        self.notes = [root + Interval(i) for i in self.recipes[chord_type]]
+        self.bass = None
+
+        if isinstance(bass, str):
+            bass = Note(bass)
+        if bass is not None:
+            inversion = None
+            for k, (steps, semitones) in enumerate(self._tones(chord_type)):
+                if _reference:
+                    tone = root + Interval._from_steps(steps, semitones)
+                else:
+                    tone = root._shift(steps, semitones)
+                if str(tone) == str(bass):
+                    inversion = k
+                    break
+            if inversion is None:
+                # not a chord tone: the bass is added below the root
+                inversion = 0
+                octave = root.octave
+                while bass.to_octave(octave).number >= root.number:
+                    octave -= 1
+                    if octave < 0:
+                        raise ValueError(
+                            'Invalid bass {} of {}: an added bass goes '
+                            'below the root, and there is no octave below '
+                            '0'.format(
+                                bass.letter.name + bass.accidental,
+                                root.scientific_notation()))
+                self.bass = bass.to_octave(octave)
+
+        if not 0 <= inversion < len(self._tones(chord_type)):
+            raise ValueError('Invalid inversion {} of {}.'.format(
+                inversion, chord_type))
+        self.inversion = inversion
+        if _reference and inversion == 0:
+            self.notes = [root + Interval(i) for i in self.recipes[chord_type]]
+        elif _reference:
+            self.notes = [root + Interval._from_steps(steps, semitones)
+                          for steps, semitones
+                          in Chord._template(chord_type, inversion)]
+        else:
+            self.notes = [root._shift(steps, semitones) for steps, semitones
+                          in Chord._template(chord_type, inversion)]
+        if self.bass is not None:
+            self.notes.insert(0, self.bass)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _spelling(letter_idx, accidental, chord_type):
+        """
+        The notes of the chord of type `chord_type` on the root with the
+        given letter index and accidental value, in root position, as
+        (letter index, accidental value, octave above the root's) tuples.
+        """
+        root = Note._from_spelling(letter_idx, accidental, 0)
+        return tuple((n.letter.idx, Note.accidental_value(n.accidental),
+                      n.octave) for n in (root._shift(steps, semitones)
+                                          for steps, semitones
+                                          in Chord._template(chord_type, 0)))
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _tones(chord_type):
+        """
+        The distinct tones of the chord type `chord_type` (octave doublings
+        removed), in ascending order, as (letter steps, semitones) from the
+        root.
+        """
+        tones = []
+        for i in sorted((Interval(i) for i in Chord.recipes[chord_type]),
+                        key=lambda i: i.semitones):
+            if all((i.semitones - t[1]) % 12 for t in tones):
+                tones.append((i.number - 1, i.semitones))
+        return tuple(tones)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _template(chord_type, inversion):
+        """
+        The notes of the chord type `chord_type` in the given inversion, as
+        (letter steps, semitones) from the root.
+
+        Root position follows the recipe. Otherwise the ascending chord tones
+        are rotated so the `inversion`-th one is in the bass, and the tones
+        below it are raised by octaves, keeping the notes in ascending order.
+        """
+        if inversion == 0:
+            return tuple((Interval(i).number - 1, Interval(i).semitones)
+                         for i in Chord.recipes[chord_type])
+        tones = Chord._tones(chord_type)
+        bass = tones[inversion]
+        template = []
+        for steps, semitones in tones[inversion:] + tones[:inversion]:
+            while semitones < bass[1]:
+                steps += 7
+                semitones += 12
+            template.append((steps, semitones))
+        return tuple(sorted(template, key=lambda t: t[1]))
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _recipe_masks():
+        """
+        The pitch-class bitmask of every chord type rooted at C, where bit
+        ``i`` is set if the chord contains the pitch class ``i`` semitones
+        above C.
+        """
+        return {name: sum(1 << s % 12 for _, s in Chord._tones(name))
+                for name in Chord.recipes}
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _root_masks():
+        """
+        The pitch-class bitmask of every chord type on every root, as a tuple
+        of (root pitch class, chord type, mask), in recipe order.
+        """
+        return tuple(
+            (root, name, ((mask << root) | (mask >> (12 - root))) & 0xfff)
+            for name, mask in Chord._recipe_masks().items()
+            for root in range(12))
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _mask_table():
+        """
+        Map every pitch-class bitmask matching a chord to the tuple of
+        (root pitch class, chord type) pairs producing it, in recipe order.
+        The table is shared and must not be modified.
+        """
+        table = {}
+        for root, name, mask in Chord._root_masks():
+            table.setdefault(mask, []).append((root, name))
+        return {mask: tuple(pairs) for mask, pairs in table.items()}
+
+    # number of bits set in every 12-bit mask
+    _popcount = [bin(mask).count('1') for mask in range(1 << 12)]
+
+    @staticmethod
+    @lru_cache(maxsize=8192)
+    def _ranked(mask, bass):
+        """
+        Score every chord against the pitch-class bitmask `mask` whose
+        lowest note is the pitch class `bass`, as a tuple of (score, root
+        pitch class, chord type), best first; see :py:meth:`best_matches`.
+        """
+        popcount = Chord._popcount
+        scored = []
+        for root, name, chord_mask in Chord._root_masks():
+            common = popcount[mask & chord_mask]
+            if common:
+                score = common - popcount[chord_mask & ~mask] - \
+                    0.5 * popcount[mask & ~chord_mask & 0xfff]
+                if root == bass:
+                    score += 0.5
+                scored.append((score, root, name))
+        return tuple(sorted(scored, key=lambda x: -x[0]))
+
+    @staticmethod
+    def best_matches(notes, k=5):
+        """
+        Rank the chords (on every root, of every type in :py:attr:`recipes`)
+        best matching a collection of notes, allowing for omitted chord tones
+        and added notes.
+
+        Every chord scores one point per note it shares with `notes`, minus
+        one point per missing chord tone and half a point per extra note,
+        plus half a point if it is rooted on the lowest note. Scores are
+        computed with bit counts on precomputed pitch-class masks, and
+        rankings are cached per (pitch-class set, lowest pitch class).
+
+        Args:
+            notes: The notes to name, in any order.
+            k (int, optional): The number of chords to return. Defaults to 5.
+
+        Returns:
+            List[Tuple[Chord, float]]: The `k` best chords and their scores,
+                best first.
+
+        Examples:
+            >>> Chord.best_matches([Note('C4'), Note('E4'), Note('Bb4')], k=2)
+            [(Chord(Note('C4'), 'dom7'), 2.5), (Chord(Note('C4'), 'aug7'), 2.5)]
+        """
+        mask = 0
+        spelling = {}
+        bass = None
+        for note in notes:
+            pc = note.number % 12
+            mask |= 1 << pc
+            spelling.setdefault(pc, note)
+            if bass is None or note.number < bass.number:
+                bass = note
+        if bass is None:
+            return []
+        bass = bass.number % 12
+
+        result = []
+        for score, root, name in Chord._ranked(mask, bass)[:k]:
+            if root in spelling:
+                note = spelling[root]
+                root_note = Note._from_spelling(
+                    note.letter.idx, Note.accidental_value(note.accidental), 4)
+            else:
+                root_note = Note._from_midi(root + 60,
+                                            *Note.default_spelling[root])
+            result.append((Chord(root_note, name), score))
+        return result
+
+    def transform(self, transformations):
+        """
+        Apply a sequence of neo-Riemannian transformations (see
+        :py:attr:`neo_riemannian`) to this triad, from left to right, and
+        return the resulting root-position chord.
+
+        Examples:
+            >>> Chord('CM').transform('RL')
+            Chord(Note('F4'), 'maj')
+        """
+        chord = self
+        for t in transformations:
+            try:
+                interval, chord_type = \
+                    self.neo_riemannian[chord.chord_type, t]
+            except KeyError:
+                raise ValueError('Cannot apply {!r} to {}'.format(t, chord))
+            root = (chord.root + Interval(interval)).to_octave(
+                chord.root.octave)
+            chord = Chord(root, chord_type)
+        return chord
+
+    def parallel(self):
+        return self.transform('P')
+
+    def leading_tone_exchange(self):
+        return self.transform('L')
+
+    def relative(self):
+        return self.transform('R')
+
+    def inversions(self):
+        """
+        Return every inversion of this chord, starting from root position.
+        """
+        return [Chord(self.root, self.chord_type, inversion=k)
+                for k in range(len(self._tones(self.chord_type)))]
 
     def __repr__(self):
-        return "Chord({!r}, {!r})".format(self.notes[0], self.chord_type)
+        if self.bass is None and self.inversion == 0:
+            return "Chord({!r}, {!r})".format(self.root, self.chord_type)
+        return "Chord({!r}, {!r}, bass={!r})".format(
+            self.root, self.chord_type, str(self.notes[0]))
 
     def __str__(self):
-        return "{}{}".format(str(self.notes[0]), self.chord_type)
+        if self.bass is None and self.inversion == 0:
+            return "{}{}".format(str(self.root), self.chord_type)
+        return "{}{}/{}".format(str(self.root), self.chord_type,
+                                str(self.notes[0]))
 
     def __eq__(self, other):
         if len(self.notes) != len(other.notes):
@@ -429,16 +1000,26 @@ class Chord:
 
             >>> Chord(Note('Eb'), 'open5').lilypond_notation('8.')
             'ees8.:1.5.8'            
+
+            >>> Chord('Cm7/G').lilypond_notation(2)
+            'c2:m7/g'
         """
 
         # Get the chord root lilypond_format() string
-        root = f"{self.notes[0].lilypond_notation()}"
+        root = f"{self.root.lilypond_notation()}"
         if self.chord_type in self.lilypond_modifiers.keys():
             modifier = self.lilypond_modifiers[self.chord_type]
         else:
             modifier = self.chord_type
+
+        # Inversions are written c/e, added bass notes c/+d
+        bass = ""
+        if self.bass is not None:
+            bass = f"/+{self.bass.lilypond_notation()}"
+        elif self.inversion != 0:
+            bass = f"/{self.notes[0].lilypond_notation()}"
         
-        return f"{root}{duration}:{modifier}" if modifier is not None else f"{root}{duration}"
+        return f"{root}{duration}:{modifier}{bass}" if modifier is not None else f"{root}{duration}{bass}"
 
 
 class Scale:
@@ -477,6 +1058,10 @@ class Scale:
     }
     greek_modes_set = set(greek_modes.values())
 
+    # names of the modes of the scales of `scales` that have no name of
+    # their own, such as 'harmonic_minor_mode5'; see :py:meth:`mode`
+    mode_pattern = re.compile(r'([a-z_]+?)_mode(\d+)$')
+
     @staticmethod
     def all(include_greek_modes=False):
         for root in Note.all():
@@ -491,13 +1076,126 @@ class Scale:
 
         if not isinstance(root, Note):
             raise TypeError('Invalid root note type: {}'.format(type(root)))
-        if name not in self.scales:
-            raise NameError('No such scale: {}'.format(name))
 
         self.root = root
         self.name = name
-        self.intervals = [Interval(i) for i in self.scales[name]]
-        self.notes = [(root + i).to_octave(0) for i in self.intervals]
+        # copies, as intervals are mutable and the template is shared
+        self.intervals = [copy(i) for i in Scale._template(name)]
+        if _reference:
+            self.notes = [(root + i).to_octave(0) for i in self.intervals]
+            return
+        self.notes = []
+        for i in self.intervals:
+            note = root._shift(i.number - 1, i.semitones)
+            self.notes.append(Note._from_spelling(
+                note.letter.idx, Note.accidental_value(note.accidental), 0))
+
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def _template(name):
+        """The intervals of the scale `name`, parsed once per scale type."""
+        if name in Scale.scales:
+            return tuple(Interval(i) for i in Scale.scales[name])
+        m = Scale.mode_pattern.match(name)
+        if m is not None and m.group(1) in Scale.scales:
+            template = Scale._template(m.group(1))
+            n = int(m.group(2))
+            if 2 <= n <= len(template):
+                return Scale._rotate(template, n)
+        raise NameError('No such scale: {}'.format(name))
+
+    @staticmethod
+    def _rotate(template, n):
+        """The intervals of the `n`-th mode of a scale with `template`."""
+        base = template[n - 1]
+        intervals = []
+        for i in template[n - 1:] + template[:n - 1]:
+            steps = (i.number - base.number) % 7
+            semitones = i.semitones - base.semitones
+            if i.number < base.number:
+                semitones += 12
+            intervals.append(Interval(
+                Interval._qualities()[steps + 1, semitones] + str(steps + 1)))
+        return tuple(intervals)
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _names():
+        """Map the intervals of the scales of `scales` to their first name."""
+        names = {}
+        for name, intervals in Scale.scales.items():
+            names.setdefault(tuple(intervals), name)
+        return names
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _mode_name(name, n):
+        """
+        The name of the `n`-th mode of the scale `name`: the scale itself
+        for the first mode, otherwise the first scale of :py:attr:`scales`
+        with the same intervals, or a name matching :py:attr:`mode_pattern`.
+        """
+        size = len(Scale._template(name))
+        if not 1 <= n <= size:
+            raise ValueError('Invalid mode {} of {}'.format(n, name))
+        m = Scale.mode_pattern.match(name)
+        base, offset = (name, 0) if m is None else \
+            (m.group(1), int(m.group(2)) - 1)
+        k = (offset + n - 1) % size + 1
+        if k == 1:
+            return base
+        template = Scale._rotate(Scale._template(base), k)
+        named = Scale._names().get(tuple(str(i) for i in template))
+        if named is not None:
+            return named
+        return '{}_mode{}'.format(base, k)
+
+    def mode(self, n):
+        """
+        Return the `n`-th mode of the scale (the first mode is the scale
+        itself): the scale on its `n`-th degree with the same notes. Modes
+        without a name of their own are named after their degree, for
+        example ``Scale('A', 'harmonic_minor').mode(5)`` is
+        ``Scale(Note('E4'), 'harmonic_minor_mode5')``.
+        """
+        name = Scale._mode_name(self.name, n)
+        return Scale(self.root + self.intervals[n - 1], name)
+
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _harmonization(name, include_dom7):
+        """
+        The chord types found by :py:meth:`harmonize` on each degree of the
+        scale `name` rooted at C.
+
+        Harmonizing is invariant under transposition, so the search is done
+        once per scale type and every other root reuses its result.
+        """
+        scale = Scale(Note('C'), name)
+        return tuple(None if chords is None else
+                     tuple(ch.chord_type for ch in chords)
+                     for chords in scale._harmonize_search(include_dom7))
+
+    @staticmethod
+    def cache_info():
+        """
+        Return the hit/miss statistics of the caches shared by all scales,
+        as a dict of :py:func:`functools.lru_cache` ``CacheInfo`` tuples.
+        """
+        return {
+            'template': Scale._template.cache_info(),
+            'harmonization': Scale._harmonization.cache_info(),
+            'mode_name': Scale._mode_name.cache_info(),
+            'spellable': Scale._spellable.cache_info(),
+        }
+
+    @staticmethod
+    def cache_clear():
+        """Empty the caches shared by all scales."""
+        Scale._template.cache_clear()
+        Scale._harmonization.cache_clear()
+        Scale._mode_name.cache_clear()
+        Scale._spellable.cache_clear()
 
     def __getitem__(self, k):
         if isinstance(k, int):
@@ -551,6 +1249,43 @@ class Scale:
         See Also:
             - :py:meth:`Scale.harmonize_dict`
         """
+        if _reference:
+            return self._harmonize_search(include_dom7)
+        template = Scale._harmonization(self.name, include_dom7)
+        for note in self.notes:
+            Scale._spellable(note.letter.idx,
+                             Note.accidental_value(note.accidental),
+                             include_dom7)
+        chords = []
+        for note, chord_types in zip(self.notes, template):
+            if chord_types is None:
+                chords.append(None)
+            else:
+                root = Note._from_spelling(
+                    note.letter.idx, Note.accidental_value(note.accidental), 4)
+                chords.append([Chord(root, t) for t in chord_types])
+        return chords
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _spellable(letter_idx, accidental, include_dom7):
+        """
+        Check that the chords of every type, and the minor seventh if
+        `include_dom7`, can be spelled on the root with the given letter
+        index and accidental value, as the search of :py:meth:`harmonize`
+        spells them; raise ValueError, like the search, otherwise.
+        """
+        for chord_type in Chord.recipes:
+            Chord._spelling(letter_idx, accidental, chord_type)
+        if include_dom7:
+            Note._from_spelling(letter_idx, accidental, 4)._shift(6, 10)
+        return True
+
+    def _harmonize_search(self, include_dom7=True):
+        """
+        Search every chord rooted on every note of the scale; this is the
+        uncached implementation behind :py:meth:`harmonize`.
+        """
         chords = [None for _ in range(len(self.notes))]
 
         for i, note in enumerate(self.notes):
@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Pitch-class set theory.
+
+Pitch-class sets are stored as 12-bit masks, where bit ``i`` is set if the
+set contains the pitch class ``i`` (C = 0). The normal form, prime form,
+Forte number and interval-class vector of all 4096 sets are computed once,
+on first use, into a table indexed by mask.
+
+Normal and prime forms follow Rahn (the tightest packing towards the first
+element, comparing from the last element inwards), so a few set classes
+(5-20, 6-Z29, 6-31, 7-Z18, 7-20 and 8-26) have a different prime form
+than in Forte's list.
+"""
+
+from functools import lru_cache
+
+from .musthe import Note
+
+
+# Forte's set classes by cardinality, in the order of his list, as prime
+# forms written with T = 10 and E = 11; Z marks Z-related set classes.
+forte_classes = {
+    1: '0',
+    2: '01 02 03 04 05 06',
+    3: '012 013 014 015 016 024 025 026 027 036 037 048',
+    4: (
+        '0123 0124 0134 0125 0126 0127 0145 0156 0167 0235 0135 0236 '
+        '0136 0237 Z0146 0157 0347 0147 0148 0158 0246 0247 0257 0248 '
+        '0268 0358 0258 0369 Z0137'
+    ),
+    5: (
+        '01234 01235 01245 01236 01237 01256 01267 02346 01246 01346 '
+        '02347 Z01356 01248 01257 01268 01347 Z01348 Z01457 01367 '
+        '01378 01458 01478 02357 01357 02358 02458 01358 02368 01368 '
+        '01468 01369 01469 02468 02469 02479 Z01247 Z03458 Z01258'
+    ),
+    6: (
+        '012345 012346 Z012356 Z012456 012367 Z012567 012678 023457 '
+        '012357 Z013457 Z012457 Z012467 Z013467 013458 012458 014568 '
+        'Z012478 012578 Z013478 014589 023468 012468 Z023568 Z013468 '
+        'Z013568 Z013578 013469 Z013569 Z013689 013679 013589 024579 '
+        '023579 013579 02468T Z012347 Z012348 Z012378 Z023458 Z012358 '
+        'Z012368 Z012369 Z012568 Z012569 Z023469 Z012469 Z012479 '
+        'Z012579 Z013479 Z014679'
+    ),
+    7: (
+        '0123456 0123457 0123458 0123467 0123567 0123478 0123678 '
+        '0234568 0123468 0123469 0134568 Z0123479 0124568 0123578 '
+        '0124678 0123569 Z0124569 Z0123589 0123679 0124789 0124589 '
+        '0125689 0234579 0123579 0234679 0134579 0124579 0135679 '
+        '0124679 0124689 0134679 0134689 012468T 013468T 013568T '
+        'Z0123568 Z0134578 Z0124578'
+    ),
+    8: (
+        '01234567 01234568 01234569 01234578 01234678 01235678 '
+        '01234589 01234789 01236789 02345679 01234579 01345679 '
+        '01234679 01245679 Z01234689 01235789 01345689 01235689 '
+        '01245689 01245789 0123468T 0123568T 0123578T 0124568T '
+        '0124678T 0124579T 0124578T 0134679T Z01235679'
+    ),
+    9: (
+        '012345678 012345679 012345689 012345789 012346789 01234568T '
+        '01234578T 01234678T 01235678T 01234679T 01235679T 01245689T'
+    ),
+    10: (
+        '0123456789 012345678T 012345679T 012345689T 012345789T '
+        '012346789T'
+    ),
+    11: '0123456789T',
+    12: '0123456789TE',
+}
+
+
+def _rotate(mask, n):
+    """Transpose the set `mask` down by `n` semitones."""
+    return ((mask >> n) | (mask << (12 - n))) & 0xfff
+
+
+def _invert(mask):
+    return sum(1 << (-i % 12) for i in range(12) if mask >> i & 1)
+
+
+def _pitch_classes(mask):
+    return [i for i in range(12) if mask >> i & 1]
+
+
+@lru_cache(maxsize=None)
+def _table():
+    """
+    The (normal form, prime form, Forte number, interval-class vector) of
+    every mask, as a list indexed by mask.
+    """
+    prime_masks = [0] * 4096
+    for mask in range(1, 4096):
+        inverted = _invert(mask)
+        prime_masks[mask] = min(min(_rotate(mask, n), _rotate(inverted, n))
+                                for n in range(12))
+
+    forte = {}
+    for cardinality, names in forte_classes.items():
+        for number, name in enumerate(names.split(), 1):
+            pcs = name.lstrip('Z').replace('T', 'A').replace('E', 'B')
+            mask = sum(1 << int(pc, 16) for pc in pcs)
+            forte[prime_masks[mask]] = '{}-{}{}'.format(
+                cardinality, 'Z' if name.startswith('Z') else '', number)
+
+    table = [((), (), None, (0, 0, 0, 0, 0, 0))]
+    for mask in range(1, 4096):
+        pcs = _pitch_classes(mask)
+        start = min(pcs, key=lambda p: (_rotate(mask, p), p))
+        normal = tuple((start + i) % 12
+                       for i in _pitch_classes(_rotate(mask, start)))
+        vector = [0] * 6
+        for i, a in enumerate(pcs):
+            for b in pcs[i + 1:]:
+                vector[min(b - a, 12 - b + a) - 1] += 1
+        prime = prime_masks[mask]
+        table.append((normal, tuple(_pitch_classes(prime)), forte[prime],
+                      tuple(vector)))
+    return table
+
+
+class PitchClassSet:
+    """
+    The pitch-class set class.
+
+    A pitch-class set can be built from notes, pitch classes (integers from
+    0 to 11), or anything with a ``notes`` attribute, such as a
+    :py:class:`Chord` or a :py:class:`Scale`.
+
+    For example:
+
+        >>> s = PitchClassSet(Chord('CM'))
+        >>> s.prime_form(), s.forte_number(), s.interval_vector()
+        ((0, 3, 7), '3-11', (0, 0, 1, 1, 1, 0))
+    """
+
+    @staticmethod
+    def from_mask(mask):
+        if not 0 <= mask < 4096:
+            raise ValueError('Invalid pitch-class set mask: {}'.format(mask))
+        pcset = PitchClassSet(())
+        pcset.mask = mask
+        return pcset
+
+    def __init__(self, collection):
+        if isinstance(collection, PitchClassSet):
+            self.mask = collection.mask
+            return
+        if hasattr(collection, 'notes'):
+            collection = collection.notes
+        mask = 0
+        for x in collection:
+            if isinstance(x, Note):
+                mask |= 1 << x.number % 12
+            elif isinstance(x, int):
+                mask |= 1 << x % 12
+            else:
+                raise TypeError('Invalid pitch class: {!r}'.format(x))
+        self.mask = mask
+
+    def pitch_classes(self):
+        return _pitch_classes(self.mask)
+
+    def normal_form(self):
+        return _table()[self.mask][0]
+
+    def prime_form(self):
+        return _table()[self.mask][1]
+
+    def forte_number(self):
+        return _table()[self.mask][2]
+
+    def interval_vector(self):
+        return _table()[self.mask][3]
+
+    def transpose(self, n):
+        return PitchClassSet.from_mask(_rotate(self.mask, -n % 12))
+
+    def invert(self):
+        return PitchClassSet.from_mask(_invert(self.mask))
+
+    def notes(self, octave=4):
+        """
+        Return the pitch classes as ascending notes in normal form order,
+        starting in the given octave, spelled with sharps (except for Eb and
+        Bb).
+        """
+        notes = []
+        midi = 12 * octave
+        for pc in self.normal_form():
+            midi += (pc - midi) % 12
+            notes.append(Note._from_midi(midi + 12, *Note.default_spelling[pc]))
+        return notes
+
+    def __len__(self):
+        return bin(self.mask).count('1')
+
+    def __iter__(self):
+        return iter(self.pitch_classes())
+
+    def __contains__(self, k):
+        if isinstance(k, Note):
+            k = k.number
+        return isinstance(k, int) and bool(self.mask >> (k % 12) & 1)
+
+    def __eq__(self, other):
+        return isinstance(other, PitchClassSet) and self.mask == other.mask
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __repr__(self):
+        return 'PitchClassSet({!r})'.format(self.pitch_classes())
+
+
+def _masks(collections):
+    for c in collections:
+        if not isinstance(c, int):
+            yield PitchClassSet(c).mask
+        elif not 0 <= c < 4096:
+            raise ValueError('Invalid pitch-class set mask: {}'.format(c))
+        else:
+            yield c
+
+
+def normal_forms(collections):
+    """
+    Return the normal forms of many collections, given as masks or as
+    anything accepted by :py:class:`PitchClassSet`.
+    """
+    table = _table()
+    return [table[m][0] for m in _masks(collections)]
+
+
+def prime_forms(collections):
+    """Return the prime forms of many collections."""
+    table = _table()
+    return [table[m][1] for m in _masks(collections)]
+
+
+def forte_numbers(collections):
+    """Return the Forte numbers of many collections."""
+    table = _table()
+    return [table[m][2] for m in _masks(collections)]
+
+
+def interval_vectors(collections):
+    """Return the interval-class vectors of many collections."""
+    table = _table()
+    return [table[m][3] for m in _masks(collections)]
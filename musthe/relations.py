@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Relationships between scales.
+"""
+
+from functools import lru_cache
+
+from .musthe import Chord, Note, Scale
+
+
+def _mask(scale):
+    """The pitch-class bitmask of a scale."""
+    return sum(1 << n.number % 12 for n in scale.notes)
+
+
+class ScaleIndex:
+    """
+    The scale index class.
+
+    Indexes the scales of every type of `names` (by default, every scale of
+    :py:attr:`Scale.scales` and all of their modes, see
+    :py:meth:`Scale.mode`) on every root of :py:meth:`Note.all`, and answers
+    questions about their relationships with dictionary lookups:
+
+    * :py:meth:`relatives`: the scales with the same pitch classes;
+    * :py:meth:`parallels`: the scales with the same root;
+    * :py:meth:`modes`: the modes of a scale, spelled with its notes;
+    * :py:meth:`common`: the number of pitch classes two scales share, and
+      :py:meth:`neighbors`, the scales sharing the most with a scale.
+
+    Scales are given as :py:class:`Scale` objects or strings such as
+    ``'C major'``, and identified by their root spelling and type, so the
+    octave of their root does not matter. Scales on other roots, such as
+    ``'B# major'``, are not in the index.
+
+    For example:
+
+        >>> index = ScaleIndex.shared()
+        >>> [str(s) for s in index.relatives('C major')][:4]
+        ['A aeolian', 'A natural_minor', 'B locrian', 'C ionian']
+        >>> index.common('C major', 'A harmonic_minor')
+        6
+    """
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def shared():
+        """Return the index of the default scales, built on first use."""
+        return ScaleIndex()
+
+    def __init__(self, names=None):
+        if names is None:
+            names = list(Scale.scales)
+            for name in Scale.scales:
+                for n in range(1, len(Scale._template(name)) + 1):
+                    mode = Scale._mode_name(name, n)
+                    if mode not in names:
+                        names.append(mode)
+        self.names = tuple(names)
+
+        # scales[key] is the scale of key (root spelling, scale type), and
+        # masks[key] its pitch-class bitmask
+        self.scales = {}
+        self.masks = {}
+        # by_mask[mask] and by_root[root] list the keys of the scales with
+        # that bitmask and that root
+        self.by_mask = {}
+        self.by_root = {}
+        for root in Note.all():
+            for name in self.names:
+                scale = Scale(root, name)
+                key = self._key(scale)
+                mask = _mask(scale)
+                self.scales[key] = scale
+                self.masks[key] = mask
+                self.by_mask.setdefault(mask, []).append(key)
+                self.by_root.setdefault(key[0], []).append(key)
+        for keys in self.by_mask.values():
+            keys.sort()
+
+        self._modes = {}
+        self._neighbors = {}
+
+    @staticmethod
+    def _key(scale):
+        if isinstance(scale, str):
+            root, name = scale.split()
+            return root, name
+        return str(scale.root), scale.name
+
+    def _lookup(self, scale):
+        key = self._key(scale)
+        if key not in self.scales:
+            raise ValueError('Scale not in the index: {} {}'.format(*key))
+        return key
+
+    def relatives(self, scale):
+        """
+        Return the scales of other types with the same pitch classes,
+        sorted by root and type. The enharmonic respellings of the scale
+        (such as ``'D# major'`` for ``'Eb major'``) are left out.
+        """
+        key = self._lookup(scale)
+        return [self.scales[k] for k in self.by_mask[self.masks[key]]
+                if k[1] != key[1]]
+
+    def parallels(self, scale):
+        """Return the scales of the other types on the same root."""
+        key = self._lookup(scale)
+        return [self.scales[k] for k in self.by_root[key[0]] if k != key]
+
+    def modes(self, scale):
+        """
+        Return the modes of a scale, from the first (the scale itself); see
+        :py:meth:`Scale.mode`. They are computed once per scale.
+        """
+        key = self._lookup(scale)
+        modes = self._modes.get(key)
+        if modes is None:
+            scale = self.scales[key]
+            modes = self._modes.setdefault(
+                key, [scale.mode(n) for n in range(1, len(scale) + 1)])
+        return list(modes)
+
+    def common(self, a, b):
+        """Return the number of pitch classes shared by two scales."""
+        return Chord._popcount[self.masks[self._lookup(a)] &
+                              self.masks[self._lookup(b)]]
+
+    def neighbors(self, scale, k=10):
+        """
+        Return the `k` other scales sharing the most pitch classes with
+        `scale`, as (scale, number of shared pitch classes) pairs, most
+        shared first. The ranking of every pitch-class set is computed once.
+        """
+        key = self._lookup(scale)
+        mask = self.masks[key]
+        ranking = self._neighbors.get(mask)
+        if ranking is None:
+            ranking = sorted(((Chord._popcount[mask & m], other) for other, m
+                              in self.masks.items()),
+                             key=lambda x: (-x[0], x[1]))
+            ranking = self._neighbors.setdefault(mask, ranking)
+        result = []
+        for shared, other in ranking:
+            if len(result) == k:
+                break
+            if other != key:
+                result.append((self.scales[other], shared))
+        return result
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Roman numeral analysis.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from .musthe import Scale
+
+
+numerals = ('I', 'II', 'III', 'IV', 'V', 'VI', 'VII')
+
+# chord type -> (whether the numeral is upper case, quality suffix)
+qualities = {
+    'maj': (True, ''),
+    'min': (False, ''),
+    'aug': (True, '+'),
+    'dim': (False, '°'),
+    'dom7': (True, '7'),
+    'maj7': (True, 'M7'),
+    'min7': (False, '7'),
+    'aug7': (True, '+7'),
+    'dim7': (False, '°7'),
+    'm7dim5': (False, 'ø7'),
+    'dom9': (True, '9'),
+    'maj9': (True, 'M9'),
+    'min9': (False, '9'),
+    'aug9': (True, '+9'),
+    'dim9': (False, '°9'),
+    'sus2': (True, 'sus2'),
+    'sus4': (True, 'sus4'),
+    'open5': (True, '5'),
+}
+
+# forms of the scale of a key whose chords count as diatonic: the three
+# forms of the minor scale
+forms = {
+    'natural_minor': ('harmonic_minor', 'melodic_minor'),
+    'aeolian': ('harmonic_minor', 'melodic_minor'),
+    'harmonic_minor': ('natural_minor', 'melodic_minor'),
+    'melodic_minor': ('natural_minor', 'harmonic_minor'),
+}
+
+# scales whose chords are borrowed by keys of each scale, in order of
+# preference; other scales borrow from the major and natural minor scales
+borrowed = {
+    'major': ('natural_minor', 'phrygian', 'harmonic_minor'),
+    'ionian': ('natural_minor', 'phrygian', 'harmonic_minor'),
+    'natural_minor': ('major', 'phrygian'),
+    'aeolian': ('major', 'phrygian'),
+    'harmonic_minor': ('major', 'phrygian'),
+    'melodic_minor': ('major', 'phrygian'),
+}
+
+
+def _steps(name):
+    return [i.semitones for i in Scale._template(name)]
+
+
+def _numeral(degree, semitones, chord_type, steps):
+    """
+    The numeral and quality suffix of the chord of type `chord_type` on
+    the `degree` of a scale with the given `steps`, with an accidental if
+    its root is `semitones` away from the tonic instead.
+    """
+    upper, suffix = qualities[chord_type]
+    accidental = (semitones - steps[degree] + 6) % 12 - 6
+    text = numerals[degree] if upper else numerals[degree].lower()
+    return ('b' * -accidental + '#' * accidental + text, suffix)
+
+
+@lru_cache(maxsize=None)
+def _table(name):
+    """
+    Map (semitones from the tonic, chord type) to the (numeral, suffix,
+    secondary target) labels of the chords of a key of the scale `name`.
+    """
+    steps = _steps(name)
+    if len(steps) != 7:
+        raise ValueError('Roman numerals need a heptatonic scale, not '
+                         '{}'.format(name))
+
+    table = {}
+    # triads[degree] lists the major and minor triads on each degree
+    triads = [[] for _ in range(7)]
+    for form in (name,) + forms.get(name, ()):
+        form_steps = _steps(form)
+        for degree, chord_types in enumerate(
+                Scale._harmonization(form, False)):
+            root = form_steps[degree]
+            for chord_type in chord_types or ():
+                label = _numeral(degree, root, chord_type, form_steps)
+                table.setdefault((root, chord_type), label + ('',))
+                if chord_type in ('maj', 'min'):
+                    triads[degree].append(label[0])
+
+    # secondary dominants and leading-tone chords of the major and minor
+    # triads on degrees other than the tonic (the major one on the
+    # dominant, if there are both)
+    for degree in range(1, 7):
+        if not triads[degree]:
+            continue
+        target = triads[degree][0]
+        if degree == 4 and 'V' in triads[degree]:
+            target = 'V'
+        for offset, head, chord_types in [
+                (7, 'V', ('maj', 'dom7', 'dom9')),
+                (11, 'vii', ('dim', 'dim7', 'm7dim5'))]:
+            root = (steps[degree] + offset) % 12
+            for chord_type in chord_types:
+                table.setdefault((root, chord_type),
+                                 (head, qualities[chord_type][1],
+                                  '/' + target))
+
+    for parallel in borrowed.get(name, ('major', 'natural_minor')):
+        if parallel == name:
+            continue
+        parallel_steps = _steps(parallel)
+        for degree, chord_types in enumerate(
+                Scale._harmonization(parallel, False)):
+            root = parallel_steps[degree]
+            for chord_type in chord_types or ():
+                table.setdefault((root, chord_type),
+                                 _numeral(degree, root, chord_type, steps) +
+                                 ('',))
+    return table
+
+
+def _figure(suffix, inversion):
+    """Add the figured bass of an inversion to a quality suffix."""
+    if inversion == 0:
+        return suffix
+    if suffix.endswith('7'):
+        return suffix[:-1] + ('7', '65', '43', '42')[inversion]
+    if suffix in ('', '+', '°') and inversion < 3:
+        return suffix + ('', '6', '64')[inversion]
+    return suffix
+
+
+class RomanAnalyzer:
+    """
+    The Roman numeral analyzer class.
+
+    Labels chords with Roman numerals relative to a key: a
+    :py:class:`Scale` with seven degrees, or a string such as
+    ``'C major'``. Besides the diatonic chords (see
+    :py:meth:`Scale.harmonize`), the analyzer knows the secondary dominants
+    (``V/ii``, ``V7/V``, ``vii°7/V``...) and the chords borrowed from
+    parallel keys (``bVI``, ``iv``, ``bII``... in a major key; see
+    :py:data:`borrowed`). Accidentals are relative to the key's own
+    scale, and inverted chords get figured bass (``V65``, ``I6``).
+
+    The labels of every (root, chord type) pair are computed once per
+    scale type and shared by all keys, so labeling a chord is a dictionary
+    lookup.
+
+    For example:
+
+        >>> RomanAnalyzer('C major').analyze(
+        ...     [Chord('CM'), Chord('Ab'), Chord('D7'), Chord('G7/B')])
+        ['I', 'bVI', 'V7/V', 'V65']
+    """
+
+    def __init__(self, key):
+        if isinstance(key, str):
+            key = Scale(*key.split())
+        self.key = key
+        self.tonic = key.root.number % 12
+        self.table = _table(key.name)
+
+    def label(self, chord):
+        """
+        Return the Roman numeral of `chord`, or ``None`` if the chord is
+        not related to the key.
+        """
+        entry = self.table.get(((chord.root.number - self.tonic) % 12,
+                                chord.chord_type))
+        if entry is None:
+            return None
+        head, suffix, target = entry
+        return head + _figure(suffix, chord.inversion) + target
+
+    def analyze(self, chords):
+        """Return the Roman numerals of a progression, as a list."""
+        return [self.label(chord) for chord in chords]
+
+
+def _analyze_song(song):
+    key, chords = song
+    return RomanAnalyzer(key).analyze(chords)
+
+
+def analyze_songs(songs, jobs=1):
+    """
+    Analyze many (key, chords) pairs, on a pool of `jobs` processes if
+    `jobs` is not 1, and return the list of their labels.
+    """
+    if jobs == 1:
+        return [_analyze_song(song) for song in songs]
+    with ProcessPoolExecutor(jobs) as pool:
+        return list(pool.map(_analyze_song, songs, chunksize=16))
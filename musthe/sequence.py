@@ -0,0 +1,273 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Array-backed sequences of notes.
+"""
+
+from array import array
+
+from .musthe import Interval, Letter, Note
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+_naturals = [Letter.letters_number[x] for x in Letter.letters]
+
+
+def _interval(steps, semitones):
+    """
+    The interval spanning `steps` letters and `semitones` semitones
+    upwards, or ``None`` if it has no name.
+    """
+    octaves = steps // 7
+    qualities = Interval._qualities()
+    quality = qualities.get((steps % 7 + 1, semitones - 12 * octaves))
+    if quality is None and steps % 7 == 0 and octaves > 0:
+        # an augmented or diminished octave
+        quality = qualities.get((8, semitones - 12 * (octaves - 1)))
+    if quality is None:
+        return None
+    return Interval(quality + str(steps + 1))
+
+
+class NoteSequence:
+    """
+    The note sequence class.
+
+    Stores notes as columns of numbers: letter index, accidental and octave
+    (``array('b')``), plus optional onsets and durations (``array('d')``,
+    in any time unit). Operations such as transposition and interval
+    extraction run over the columns without building :py:class:`Note`
+    objects, and notes are only built when they are read.
+
+    Columns are exposed as memoryviews, so slicing a sequence does not
+    copy them, and ``numpy.asarray(seq.octave)`` shares their memory. If
+    NumPy is installed, transposition works on whole columns at once.
+
+    For example:
+
+        >>> seq = NoteSequence.from_notes([Note('C4'), Note('E4'), Note('G4')])
+        >>> list(seq.transpose(Interval('m3')))
+        [Note('Eb4'), Note('G4'), Note('Bb4')]
+        >>> [str(i) for i in seq.intervals()]
+        ['M3', 'm3']
+    """
+
+    def __init__(self, letter, accidental, octave, onset=None,
+                 duration=None):
+        columns = [memoryview(array('b', letter)),
+                   memoryview(array('b', accidental)),
+                   memoryview(array('b', octave))]
+        for times in (onset, duration):
+            columns.append(None if times is None
+                           else memoryview(array('d', times)))
+        self._set(*columns)
+
+    def _set(self, letter, accidental, octave, onset, duration):
+        lengths = {len(c) for c in (letter, accidental, octave, onset,
+                                    duration) if c is not None}
+        if len(lengths) > 1:
+            raise ValueError('Columns have different lengths')
+        for acc in accidental:
+            if not -3 <= acc <= 3:
+                raise ValueError('Invalid accidental: {}'.format(acc))
+        for o in octave:
+            if not 0 <= o <= 9:
+                raise ValueError('Invalid octave: {}'.format(o))
+        self.letter = letter
+        self.accidental = accidental
+        self.octave = octave
+        self.onset = onset
+        self.duration = duration
+
+    @staticmethod
+    def _view(letter, accidental, octave, onset, duration):
+        """Wrap existing columns, without copying or checking them."""
+        seq = NoteSequence.__new__(NoteSequence)
+        seq.letter = letter
+        seq.accidental = accidental
+        seq.octave = octave
+        seq.onset = onset
+        seq.duration = duration
+        return seq
+
+    @staticmethod
+    def from_notes(notes, onsets=None, durations=None):
+        letter, accidental, octave = array('b'), array('b'), array('b')
+        for n in notes:
+            letter.append(n.letter.idx)
+            accidental.append(n.number - _naturals[n.letter.idx] -
+                              12 * n.octave)
+            octave.append(n.octave)
+        return NoteSequence(letter, accidental, octave, onsets, durations)
+
+    @staticmethod
+    def from_midi(numbers, onsets=None, durations=None):
+        """
+        Build a sequence from MIDI note numbers, spelled with
+        :py:attr:`Note.default_spelling`.
+        """
+        letter, accidental, octave = array('b'), array('b'), array('b')
+        spelling = Note.default_spelling
+        for midi in numbers:
+            idx, acc = spelling[midi % 12]
+            letter.append(idx)
+            accidental.append(acc)
+            octave.append((midi - 12 - _naturals[idx] - acc) // 12)
+        return NoteSequence(letter, accidental, octave, onsets, durations)
+
+    def numbers(self):
+        """Return the note numbers (see :py:attr:`Note.number`)."""
+        return array('i', [_naturals[l] + a + 12 * o for l, a, o
+                           in zip(self.letter, self.accidental, self.octave)])
+
+    def midi_notes(self):
+        return array('i', [n + 12 for n in self.numbers()])
+
+    def to_notes(self):
+        return [Note._from_spelling(l, a, o) for l, a, o
+                in zip(self.letter, self.accidental, self.octave)]
+
+    def transpose(self, interval, down=False):
+        """
+        Return the sequence transposed by `interval` (up, or down if `down`
+        is true), spelled as adding the interval to each note does.
+        """
+        if isinstance(interval, str):
+            interval = Interval(interval)
+        steps, semitones = interval.number - 1, interval.semitones
+        if down:
+            steps, semitones = -steps, -semitones
+        if np is not None:
+            letter, accidental, octave = self._transpose_arrays(steps,
+                                                                semitones)
+        else:
+            letter, accidental, octave = self._transpose_loop(steps,
+                                                              semitones)
+        if octave and not 0 <= min(octave) <= max(octave) <= 9:
+            raise ValueError('Transposition out of the octave range')
+        if down and octave and min(self.octave) < len(interval.split()):
+            # as subtracting the interval from a note, which goes through
+            # the octave below for every octave of the interval
+            raise ValueError('Transposition out of the octave range')
+        return NoteSequence._view(memoryview(letter), memoryview(accidental),
+                                  memoryview(octave), self.onset,
+                                  self.duration)
+
+    def _transpose_arrays(self, steps, semitones):
+        """The columns of :py:meth:`transpose`, computed with NumPy."""
+        naturals = np.array(_naturals)
+        l = np.asarray(self.letter, dtype=int)
+        idx = l + steps
+        new = idx % 7
+        difference = (naturals[l] + np.asarray(self.accidental) +
+                      semitones) % 12 - naturals[new]
+        difference[difference < -3] += 12
+        difference[difference > 3] -= 12
+        octave = np.asarray(self.octave) + idx // 7
+        # keep out-of-range octaves representable, for the range check
+        octave = np.clip(octave, -128, 127)
+        return tuple(array('b', column.astype(np.int8).tobytes())
+                     for column in (new, difference, octave))
+
+    def _transpose_loop(self, steps, semitones):
+        """The columns of :py:meth:`transpose`, computed note by note."""
+        letter, accidental, octave = array('b'), array('b'), array('b')
+        for l, a, o in zip(self.letter, self.accidental, self.octave):
+            idx = l + steps
+            new = idx % 7
+            difference = (_naturals[l] + a + semitones) % 12 - _naturals[new]
+            if difference < -3:
+                difference += 12
+            if difference > 3:
+                difference -= 12
+            letter.append(new)
+            accidental.append(difference)
+            octave.append(o + idx // 7)
+        return letter, accidental, octave
+
+    def semitones(self):
+        """Return the signed semitones between consecutive notes."""
+        numbers = self.numbers()
+        return array('i', [b - a for a, b in zip(numbers, numbers[1:])])
+
+    def intervals(self):
+        """
+        Return the intervals between consecutive notes, regardless of
+        direction (``None`` where the interval has no name).
+        """
+        result = []
+        numbers = self.numbers()
+        positions = [l + 7 * o for l, o in zip(self.letter, self.octave)]
+        for k in range(1, len(numbers)):
+            steps = positions[k] - positions[k - 1]
+            semitones = numbers[k] - numbers[k - 1]
+            if steps < 0 or (steps == 0 and semitones < 0):
+                steps, semitones = -steps, -semitones
+            result.append(_interval(steps, semitones))
+        return result
+
+    def lilypond_notation(self):
+        """
+        Return the notes in LilyPond absolute pitch notation, with the
+        durations in quarter notes when they have a LilyPond equivalent.
+        """
+        durations = {4.0: '1', 2.0: '2', 1.0: '4', 0.5: '8', 0.25: '16',
+                     3.0: '2.', 1.5: '4.', 0.75: '8.'}
+        words = []
+        for k, note in enumerate(self):
+            word = note.lilypond_notation()
+            word += "'" * max(0, note.octave - 3) + ',' * max(0, 3 - note.octave)
+            if self.duration is not None:
+                word += durations.get(self.duration[k], '')
+            words.append(word)
+        return ' '.join(words)
+
+    def note_events(self):
+        """
+        Return (time, MIDI number, on) events for the notes of the sequence,
+        which needs onsets and durations, sorted by time (note-offs first);
+        these can be fed to a :py:class:`musthe.chordify.Chordifier`.
+        """
+        if self.onset is None or self.duration is None:
+            raise ValueError('The sequence has no onsets or durations')
+        events = []
+        for midi, t, d in zip(self.midi_notes(), self.onset, self.duration):
+            events.append((t, midi, True))
+            events.append((t + d, midi, False))
+        events.sort(key=lambda e: (e[0], e[2]))
+        return events
+
+    def __len__(self):
+        return len(self.letter)
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return NoteSequence._view(*(None if c is None else c[k] for c in (
+                self.letter, self.accidental, self.octave, self.onset,
+                self.duration)))
+        return Note._from_spelling(self.letter[k], self.accidental[k],
+                                   self.octave[k])
+
+    def __iter__(self):
+        for l, a, o in zip(self.letter, self.accidental, self.octave):
+            yield Note._from_spelling(l, a, o)
+
+    def __eq__(self, other):
+        if not isinstance(other, NoteSequence):
+            return False
+        return all(
+            (a is None and b is None) or
+            (a is not None and b is not None and a.tolist() == b.tolist())
+            for a, b in zip(
+                (self.letter, self.accidental, self.octave, self.onset,
+                 self.duration),
+                (other.letter, other.accidental, other.octave, other.onset,
+                 other.duration)))
+
+    def __repr__(self):
+        return 'NoteSequence.from_notes({!r})'.format(self.to_notes())
@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+A local JSON query service, over HTTP, built on asyncio.
+
+Queries are POSTed to ``/query`` as a JSON object ``{"op": ..., "params":
+{...}}``, or as a list of such objects, and answered with the result (or
+the list of results). Results of failed queries are objects with an
+``error`` key. ``GET /stats`` returns the cache and batching counters.
+
+Batched transpose queries are answered with one
+:py:meth:`NoteSequence.transpose` per interval and direction, which works on
+whole NumPy columns if NumPy is installed. The other operations have no
+vectorized form: they answer the queries of a batch one by one, and share
+the list of scales and the caches of the core classes.
+
+    $ python -m musthe.service --port 8765 &
+    $ curl -d '{"op": "chord.identify", "params": {"notes": ["C", "E", "G"]}}' \\
+    >     localhost:8765/query
+    [{"chord": "Cmaj", "score": 3.5}]
+"""
+
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+from functools import lru_cache
+
+from .cli import _item
+from .musthe import Chord, Interval, Note, Scale
+from .sequence import NoteSequence
+
+
+@lru_cache(maxsize=None)
+def _scales(greek_modes):
+    return tuple(Scale.all(greek_modes))
+
+
+def _transpose(queries):
+    # one transposition of a note sequence per interval and direction
+    groups = {}
+    for k, q in enumerate(queries):
+        groups.setdefault((q['interval'], bool(q.get('down', False))),
+                          []).append(k)
+    results = [None] * len(queries)
+    for (name, down), indices in groups.items():
+        seq = NoteSequence.from_notes([Note(queries[k]['note'])
+                                       for k in indices])
+        for k, note in zip(indices, seq.transpose(Interval(name), down)):
+            results[k] = note.scientific_notation()
+    return results
+
+
+def _chord_parse(queries):
+    return [[n.scientific_notation() for n in Chord(q['chord']).notes]
+            for q in queries]
+
+
+def _chord_identify(queries):
+    return [[{'chord': str(chord), 'score': score} for chord, score
+             in Chord.best_matches([Note(n) for n in q['notes']],
+                                   q.get('k', 1))]
+            for q in queries]
+
+
+def _scale_find(queries):
+    results = []
+    for q in queries:
+        items = [_item(t) for t in q['items']]
+        results.append([str(s) for s in _scales(q.get('greek_modes', False))
+                        if items in s])
+    return results
+
+
+def _harmonize(queries):
+    results = []
+    for q in queries:
+        scale = Scale(*q['scale'].split())
+        results.append([None if chords is None else [str(c) for c in chords]
+                        for chords in
+                        scale.harmonize(q.get('include_dom7', True))])
+    return results
+
+
+"""Maps operation names to functions answering a list of queries (the
+params of each query) with the list of their results."""
+operations = {
+    'transpose': _transpose,
+    'chord.parse': _chord_parse,
+    'chord.identify': _chord_identify,
+    'scale.find': _scale_find,
+    'harmonize': _harmonize,
+}
+
+
+class Service:
+    """
+    The service class.
+
+    Answers queries (see :py:data:`operations`) through three layers:
+
+    * a cache of the last `cache_size` results, shared by all clients;
+    * coalescing: a query identical to one still being answered waits for
+      the same result instead of being computed again;
+    * batching: queries for the same operation arriving within
+      `batch_delay` seconds of each other (up to `batch_size` of them) are
+      answered with a single call of the operation.
+
+    The service only listens on the loopback interface.
+
+    For example:
+
+        >>> async def main():
+        ...     service = Service()
+        ...     return await service.query('transpose',
+        ...                                {'note': 'C4', 'interval': 'P5'})
+        >>> asyncio.run(main())
+        'G4'
+    """
+
+    loopback = ('127.0.0.1', '::1', 'localhost')
+
+    def __init__(self, host='127.0.0.1', port=0, cache_size=4096,
+                 batch_size=64, batch_delay=0.001):
+        if host not in self.loopback:
+            raise ValueError('The service only listens on localhost, not '
+                             '{}'.format(host))
+        self.host = host
+        self.port = port
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.cache = OrderedDict()
+        self.inflight = {}
+        self.pending = {}
+        self.stats = {'queries': 0, 'hits': 0, 'coalesced': 0, 'batches': 0,
+                      'computed': 0}
+        self.server = None
+
+    async def query(self, op, params):
+        """Answer a single query; raise ValueError if it fails."""
+        if op not in operations:
+            raise ValueError('No such operation: {}'.format(op))
+        key = (op, json.dumps(params, sort_keys=True))
+        self.stats['queries'] += 1
+        if key in self.cache:
+            self.stats['hits'] += 1
+            self.cache.move_to_end(key)
+            result = self.cache[key]
+        elif key in self.inflight:
+            self.stats['coalesced'] += 1
+            result = await asyncio.shield(self.inflight[key])
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self.inflight[key] = future
+            self._enqueue(op, params, future)
+            try:
+                result = await asyncio.shield(future)
+            finally:
+                del self.inflight[key]
+            self.cache[key] = result
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        if isinstance(result, tuple):
+            # the query failed: ('error', message)
+            raise ValueError(result[1])
+        return result
+
+    def _enqueue(self, op, params, future):
+        batch = self.pending.get(op)
+        if batch is None:
+            batch = self.pending[op] = []
+            asyncio.get_running_loop().call_later(
+                self.batch_delay, self._flush, op, batch)
+        batch.append((params, future))
+        if len(batch) >= self.batch_size:
+            self._flush(op, batch)
+
+    def _flush(self, op, batch):
+        if self.pending.get(op) is not batch:
+            # already flushed, because it was full
+            return
+        del self.pending[op]
+        self.stats['batches'] += 1
+        self.stats['computed'] += len(batch)
+        try:
+            results = operations[op]([params for params, _ in batch])
+        except Exception:
+            # answer the queries one by one, to find the failing ones
+            results = []
+            for params, _ in batch:
+                try:
+                    results.append(operations[op]([params])[0])
+                except Exception as e:
+                    # a marker rather than the exception, which would keep
+                    # its traceback (and grow it every time it is raised)
+                    results.append(
+                        ('error', '{}: {}'.format(type(e).__name__, e)))
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _answer(self, query):
+        try:
+            return await self.query(query['op'], query.get('params', {}))
+        except (KeyError, TypeError, AttributeError):
+            return {'error': 'Invalid query: {!r}'.format(query)}
+        except ValueError as e:
+            return {'error': str(e)}
+
+    async def _respond(self, method, path, body):
+        if method == 'GET' and path == '/stats':
+            return 200, self.stats
+        if method != 'POST' or path != '/query':
+            return 404, {'error': 'Not found: {} {}'.format(method, path)}
+        try:
+            request = json.loads(body or b'null')
+        except ValueError:
+            return 400, {'error': 'Invalid JSON'}
+        if isinstance(request, list):
+            return 200, await asyncio.gather(
+                *(self._answer(q) for q in request))
+        return 200, await self._answer(request)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, path, version = line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(
+                    int(headers.get('content-length', 0)))
+                status, result = await self._respond(method, path, body)
+                data = json.dumps(result).encode()
+                close = headers.get('connection', '').lower() == 'close' or \
+                    version == 'HTTP/1.0'
+                writer.write(
+                    'HTTP/1.1 {} {}\r\nContent-Type: application/json\r\n'
+                    'Content-Length: {}\r\nConnection: {}\r\n\r\n'.format(
+                        status, {200: 'OK', 400: 'Bad Request',
+                                 404: 'Not Found'}[status], len(data),
+                        'close' if close else 'keep-alive').encode() + data)
+                await writer.drain()
+                if close:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        """Start listening; :py:attr:`port` is then the actual port."""
+        self.server = await asyncio.start_server(
+            self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        await self.server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m musthe.service',
+        description='Serve musthe queries on localhost.')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--cache-size', type=int, default=4096)
+    args = parser.parse_args(argv)
+    service = Service(port=args.port, cache_size=args.cache_size)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+The neo-Riemannian transformation graph of the major and minor triads.
+"""
+
+from collections import deque
+from functools import lru_cache
+
+from .musthe import Chord, Interval
+
+
+class Tonnetz:
+    """
+    The Tonnetz class.
+
+    The graph has one node per major and minor triad (24 of them, up to
+    enharmonic equivalence) and one edge per neo-Riemannian transformation
+    in `transformations` (see :py:attr:`Chord.neo_riemannian`). Shortest
+    transformation paths between all pairs of triads are found by BFS when
+    the graph is built, so path queries are lookups. Use
+    :py:meth:`Tonnetz.shared` to build each graph only once.
+
+    For example:
+
+        >>> Tonnetz.shared().path(Chord('CM'), Chord('EbM'))
+        'PR'
+    """
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def shared(transformations='PLR'):
+        """Return the graph for `transformations`, built on first use."""
+        return Tonnetz(transformations)
+
+    def __init__(self, transformations='PLR'):
+        for t in transformations:
+            if ('maj', t) not in Chord.neo_riemannian:
+                raise ValueError('Invalid transformation: {!r}'.format(t))
+        self.transformations = transformations
+
+        self.nodes = [(pc, q) for q in ('maj', 'min') for pc in range(12)]
+        self.edges = {}
+        for node in self.nodes:
+            self.edges[node] = [(t, self._apply(node, t))
+                                for t in transformations]
+
+        # paths[a][b] is the shortest sequence of transformations from a to b
+        self.paths = {node: self._bfs(node) for node in self.nodes}
+
+    @staticmethod
+    def _apply(node, t):
+        pc, chord_type = node
+        interval, new_type = Chord.neo_riemannian[chord_type, t]
+        return (pc + Interval(interval).semitones) % 12, new_type
+
+    def _bfs(self, source):
+        paths = {source: ''}
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            for t, neighbor in self.edges[node]:
+                if neighbor not in paths:
+                    paths[neighbor] = paths[node] + t
+                    queue.append(neighbor)
+        return paths
+
+    @staticmethod
+    def _node(chord):
+        if chord.chord_type not in ('maj', 'min'):
+            raise ValueError('Not a major or minor triad: {}'.format(chord))
+        return chord.root.number % 12, chord.chord_type
+
+    def neighbors(self, chord):
+        """
+        Return the (transformation, chord) pairs of the triads one
+        transformation away from `chord`.
+        """
+        return [(t, chord.transform(t)) for t in self.transformations]
+
+    def path(self, a, b):
+        """
+        Return a shortest sequence of transformations from triad `a` to
+        triad `b` (to be applied from left to right), or ``None`` if there
+        is none.
+        """
+        return self.paths[self._node(a)].get(self._node(b))
+
+    def distance(self, a, b):
+        """
+        Return the number of transformations on a shortest path from triad
+        `a` to triad `b`, or ``None`` if there is none.
+        """
+        path = self.path(a, b)
+        return None if path is None else len(path)
+
+    def chord_path(self, a, b):
+        """
+        Return the triads on a shortest path from `a` to `b`, both included.
+        """
+        path = self.path(a, b)
+        if path is None:
+            return None
+        chords = [a]
+        for t in path:
+            chords.append(chords[-1].transform(t))
+        return chords
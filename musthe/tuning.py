@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tuning systems.
+"""
+
+from array import array
+from fractions import Fraction
+
+from .musthe import Letter, Note
+
+
+class Tuning:
+    """
+    The tuning class.
+
+    A tuning gives the frequency of every note, relative to a tonic, with
+    the reference note A4 sounding at `a4` Hz.
+
+    In the fifth-based systems (see :py:attr:`Tuning.systems`), the pitch of
+    a note depends on its position on the line of fifths, so enharmonic
+    notes (such as C# and Db) have different frequencies. Tunings read from
+    Scala files map chromatic steps above the tonic to scale degrees.
+
+    Frequencies of all the notes from Cbbb0 to B###9 are computed once, when
+    the tuning is built, so :py:meth:`frequency` and :py:meth:`frequencies`
+    are table lookups.
+
+    For example:
+
+        >>> just = Tuning('just', tonic='C')
+        >>> Note('E4').frequency(tuning=just) / Note('C4').frequency(just)
+        1.25
+    """
+
+    # ratio of the pitch `k` fifths above the tonic (below if negative),
+    # before octave reduction; 'just' is 5-limit just intonation, with
+    # rows of four fifths (F C G D, A E B F#, ...) a syntonic comma apart
+    systems = {
+        'equal': lambda k: 2 ** (7 * k / 12.),
+        'pythagorean': lambda k: 1.5 ** k,
+        'meantone': lambda k: 5 ** (k / 4.),
+        'just': lambda k: 1.5 ** k * (80 / 81.) ** ((k + 1) // 4),
+    }
+
+    # position of every letter on the line of fifths, from C
+    fifths = {'F': -1, 'C': 0, 'G': 1, 'D': 2, 'A': 3, 'E': 4, 'B': 5}
+
+    def __init__(self, system='equal', tonic='C', a4=440.0):
+        if isinstance(system, str):
+            if system not in self.systems:
+                raise NameError('No such tuning system: {}'.format(system))
+            self.name = system
+            self.ratios = None
+            ratio = self.systems[system]
+        else:
+            self.name = 'scala'
+            self.ratios = [float(r) for r in system]
+            if len(self.ratios) < 1 or min(self.ratios) <= 0:
+                raise ValueError('Invalid scale: {!r}'.format(system))
+            ratio = None
+        self.tonic = tonic if isinstance(tonic, Note) else Note(tonic)
+        self.a4 = a4
+
+        def position(note):
+            return self.fifths[note.letter.name] + 7 * Tuning._accidental(note)
+
+        def pitch(note):
+            # frequency ratio of note to the tonic
+            s = note.number - self.tonic.number
+            if ratio is None:
+                n = len(self.ratios)
+                octaves, degree = divmod(s, n)
+                period = self.ratios[-1]
+                return period ** octaves * \
+                    (self.ratios[degree - 1] if degree else 1.0)
+            k = position(note) - position(self.tonic)
+            return ratio(k) * 2. ** ((s - 7 * k) // 12)
+
+        scale = a4 / pitch(Note('A4'))
+        self.table = array('d', [0.0] * (10 * 7 * 7))
+        for octave in range(10):
+            for letter in Letter.letters:
+                for acc in range(-3, 4):
+                    note = Note._from_spelling(
+                        Letter.letters_idx[letter], acc, octave)
+                    self.table[self._index(note)] = scale * pitch(note)
+
+    @staticmethod
+    def _accidental(note):
+        return note.number - note.letter.number() - 12 * note.octave
+
+    @staticmethod
+    def _index(note):
+        return (note.octave * 7 + note.letter.idx) * 7 + \
+            Tuning._accidental(note) + 3
+
+    @staticmethod
+    def from_scala(source, tonic='C', a4=440.0):
+        """
+        Build a tuning from a Scala (.scl) file, given as a file name or as a
+        file object. The first degree of the scale is the tonic.
+        """
+        if isinstance(source, str):
+            with open(source) as f:
+                return Tuning.from_scala(f, tonic, a4)
+        lines = [line.strip() for line in source
+                 if not line.lstrip().startswith('!')]
+        try:
+            count = int(lines[1])
+            ratios = []
+            for line in lines[2:2 + count]:
+                value = line.split()[0]
+                if '.' in value:
+                    ratios.append(2 ** (float(value) / 1200))
+                else:
+                    ratios.append(float(Fraction(value)))
+        except (IndexError, ValueError, ZeroDivisionError):
+            raise ValueError('Invalid Scala file')
+        if len(ratios) != count:
+            raise ValueError('Invalid Scala file')
+        return Tuning(ratios, tonic, a4)
+
+    def frequency(self, note):
+        """Return the frequency of `note`, in Hz."""
+        return self.table[self._index(note)]
+
+    def frequencies(self, notes):
+        """Return the frequencies of many notes, as an array of floats."""
+        table, index = self.table, self._index
+        return array('d', [table[index(n)] for n in notes])
+
+    def __repr__(self):
+        return 'Tuning({!r}, tonic={!r}, a4={!r})'.format(
+            self.ratios if self.ratios is not None else self.name,
+            str(self.tonic), self.a4)
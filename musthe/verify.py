@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Differential verification of the accelerated engine against the reference
+one (see :py:func:`musthe.set_engine`).
+
+Every case runs the same operation on every input with both engines, and
+compares the results (or the types of the exceptions raised); every
+difference, including inputs only one engine handles, is a mismatch.
+
+    $ python -m musthe.verify
+    case                inputs  mismatches  reference  accelerated  speedup
+    note + interval      38220           0    0.415 s      0.095 s     4.4x
+    ...
+"""
+
+import argparse
+import sys
+import time
+
+from .musthe import (Chord, Interval, Letter, Note, Scale, get_engine,
+                     set_engine)
+
+
+def _notes(min_octave, max_octave, accidentals):
+    """The notes of the octaves given with every letter and accidental."""
+    return [Note._from_spelling(letter_idx, acc, octave)
+            for octave in range(min_octave, max_octave + 1)
+            for letter_idx in range(len(Letter.letters))
+            for acc in accidentals]
+
+
+def _intervals():
+    """The simple intervals, and the compound ones up to two octaves."""
+    intervals = list(Interval.all())
+    intervals += [Interval(i.quality + str(i.number + 7))
+                  for i in Interval.all() if i.number > 1]
+    intervals += [Interval(i.quality + str(i.number + 14))
+                  for i in Interval.all() if i.number > 1]
+    return intervals
+
+
+def _scale_names():
+    """The scales of :py:attr:`Scale.scales`, and all of their modes."""
+    names = list(Scale.scales)
+    for name in Scale.scales:
+        for n in range(2, len(Scale._template(name)) + 1):
+            mode = Scale._mode_name(name, n)
+            if mode not in names:
+                names.append(mode)
+    return names
+
+
+def _describe(result):
+    """A comparable description of a result."""
+    if isinstance(result, Note):
+        return result.scientific_notation()
+    if isinstance(result, (Chord, Scale)):
+        return (str(result), [n.scientific_notation() for n in result.notes])
+    if isinstance(result, list):
+        return [_describe(r) for r in result]
+    return None if result is None else str(result)
+
+
+def _outcome(function, item):
+    """
+    Whether `function` succeeds on `item`, and the description of its
+    result or the name of the exception raised.
+    """
+    try:
+        return True, _describe(function(*item))
+    except Exception as e:
+        return False, type(e).__name__
+
+
+"""Maps case names to functions returning (inputs, operation), where the
+operation is called with every input (a tuple of arguments)."""
+cases = {
+    'note + interval': lambda: (
+        [(n, i) for n in _notes(0, 9, range(-3, 4)) for i in _intervals()],
+        lambda note, interval: note + interval),
+    'note - interval': lambda: (
+        [(n, i) for n in _notes(0, 9, range(-3, 4)) for i in _intervals()],
+        lambda note, interval: note - interval),
+    'note - note': lambda: (
+        [(a, b) for a in _notes(0, 9, range(-3, 4))
+         for b in _notes(0, 9, range(-3, 4))],
+        lambda a, b: a - b),
+    # symbols on roots with up to three accidentals, and slash chords
+    'chord symbols': lambda: (
+        [(str(root) + chord_type,) for root in _notes(4, 4, range(-3, 4))
+         for chord_type in Chord.valid_types] +
+        [(str(root) + chord_type + '/' + str(bass),)
+         for root in _notes(4, 4, range(-3, 4))
+         for chord_type in Chord.recipes
+         for bass in _notes(4, 4, range(-3, 4))],
+        Chord),
+    'chords': lambda: (
+        [(root, chord_type) for root in _notes(0, 9, range(-3, 4))
+         for chord_type in Chord.recipes],
+        Chord),
+    'scales': lambda: (
+        [(root, name) for root in _notes(0, 9, range(-3, 4))
+         for name in _scale_names()],
+        Scale),
+    'harmonize': lambda: (
+        [(root, name, include_dom7) for root in _notes(4, 4, range(-3, 4))
+         for name in _scale_names() for include_dom7 in (True, False)],
+        lambda root, name, include_dom7:
+            Scale(root, name).harmonize(include_dom7)),
+}
+
+
+def _run(operation, inputs):
+    start = time.perf_counter()
+    outcomes = [_outcome(operation, item) for item in inputs]
+    return outcomes, time.perf_counter() - start
+
+
+def verify(names=None):
+    """
+    Run the cases in `names` (all of :py:data:`cases` by default) with both
+    engines, and return a report per case: a dict with the case name, the
+    number of inputs, the mismatches, as (input, reference result,
+    accelerated result) tuples, and the time taken by each engine.
+
+    The engines are switched with :py:func:`musthe.set_engine`, for the
+    whole process, so this is not thread safe: other threads must not use
+    musthe meanwhile.
+    """
+    engine = get_engine()
+    reports = []
+    try:
+        for name in names or cases:
+            if name not in cases:
+                raise NameError('No such case: {}'.format(name))
+            inputs, operation = cases[name]()
+            set_engine('reference')
+            reference, reference_time = _run(operation, inputs)
+            set_engine('accelerated')
+            accelerated, accelerated_time = _run(operation, inputs)
+            reports.append({
+                'case': name,
+                'inputs': len(inputs),
+                'mismatches': [(item, a[1], b[1]) for item, a, b
+                               in zip(inputs, reference, accelerated)
+                               if a != b],
+                'reference': reference_time,
+                'accelerated': accelerated_time,
+            })
+    finally:
+        set_engine(engine)
+    return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m musthe.verify',
+        description='Compare the accelerated engine with the reference one.')
+    parser.add_argument('cases', nargs='*', metavar='CASE',
+                        help='cases to run (default: all of {})'.format(
+                            ', '.join(repr(c) for c in cases)))
+    parser.add_argument('--show', type=int, default=5, metavar='N',
+                        help='mismatches to show per case (default: 5)')
+    args = parser.parse_args(argv)
+
+    print('{:<18} {:>7} {:>11} {:>10} {:>12} {:>8}'.format(
+        'case', 'inputs', 'mismatches', 'reference', 'accelerated',
+        'speedup'))
+    failed = False
+    for report in verify(args.cases):
+        print('{:<18} {:>7} {:>11} {:>8.3f} s {:>10.3f} s {:>7.1f}x'
+              .format(report['case'], report['inputs'],
+                      len(report['mismatches']), report['reference'], report['accelerated'],
+                      report['reference'] / max(report['accelerated'],
+                                                1e-9)))
+        for item, a, b in report['mismatches'][:args.show]:
+            print('    {}: reference {!r}, accelerated {!r}'.format(
+                ', '.join(str(x) for x in item), a, b))
+        failed = failed or bool(report['mismatches'])
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
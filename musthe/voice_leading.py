@@ -0,0 +1,266 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Voice leading over chord progressions.
+"""
+
+from functools import lru_cache
+from math import inf
+from operator import add, sub
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .musthe import Note
+
+
+class VoiceLeader:
+    """
+    The voice leader class.
+
+    Given a progression of chords, finds the sequence of voicings that
+    minimises the total motion of the voices (the sum of the semitones
+    moved by every voice between consecutive chords), plus optional
+    penalties for parallel fifths/octaves and wide spacing.
+
+    Voices are ordered from the lowest (bass) to the highest, and never
+    cross. Every voice has a range, given as a pair of notes (or note
+    strings); the default is SATB for four voices.
+
+    The search is exact unless `beam` is given, in which case only the
+    `beam` cheapest partial paths are kept after every chord. The costs of
+    the moves between the voicings of two chords are computed once per
+    pair of chords (with array operations, if NumPy is installed), so
+    corpora of progressions with recurring chord changes are fast to lead.
+
+    For example:
+
+        >>> vl = VoiceLeader()
+        >>> [[str(n) for n in v] for v in vl.lead([Chord('CM'), Chord('GM')])]
+        [['G', 'E', 'C', 'G'], ['G', 'D', 'B', 'G']]
+    """
+
+    satb_ranges = (('E2', 'C4'), ('C3', 'G4'), ('G3', 'C5'), ('C4', 'G5'))
+
+    def __init__(self, voices=4, ranges=None, parallels=10.0, spacing=1.0,
+                 beam=None):
+        if ranges is None:
+            if voices != len(self.satb_ranges):
+                raise ValueError('Ranges are required for {} voices'
+                                 .format(voices))
+            ranges = self.satb_ranges
+        if len(ranges) != voices:
+            raise ValueError('Expected {} ranges, got {}'
+                             .format(voices, len(ranges)))
+
+        self.voices = voices
+        self.ranges = tuple(
+            tuple((Note(n) if isinstance(n, str) else n).midi_note()
+                  for n in r)
+            for r in ranges)
+        for low, high in self.ranges:
+            if low > high:
+                raise ValueError('Invalid voice range: {} > {}'
+                                 .format(low, high))
+        self.parallels = parallels
+        self.spacing = spacing
+        self.beam = beam
+
+    @staticmethod
+    def _tones(chord):
+        """
+        The distinct chord tones as (pitch class, letter index, accidental)
+        tuples in recipe order, and the recipe interval numbers.
+        """
+        tones = []
+        numbers = []
+        seen = set()
+        root = chord.root
+        for note in chord.notes:
+            pc = note.number % 12
+            if pc not in seen:
+                seen.add(pc)
+                tones.append((pc, note.letter.idx,
+                              Note.accidental_value(note.accidental)))
+                numbers.append((note.letter.idx - root.letter.idx) % 7 + 1)
+        return tuple(tones), tuple(numbers)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _candidates(tones, numbers, ranges):
+        """
+        All voicings of `tones` within `ranges`, as tuples of MIDI numbers.
+
+        Voices are non-decreasing from the bass up, and every chord tone is
+        present, except that the fifth (then the highest extensions) is
+        omitted when there are more chord tones than voices.
+        """
+        tones = list(tones)
+        numbers = list(numbers)
+        while len(tones) > len(ranges):
+            i = numbers.index(5) if 5 in numbers else len(tones) - 1
+            del tones[i]
+            del numbers[i]
+        pcs = frozenset(t[0] for t in tones)
+
+        options = [[p for p in range(low, high + 1) if p % 12 in pcs]
+                   for low, high in ranges]
+        result = []
+
+        def search(voice, lowest, chosen, covered):
+            missing = len(pcs) - len(covered)
+            if missing > len(ranges) - voice:
+                return
+            if voice == len(ranges):
+                result.append(tuple(chosen))
+                return
+            for p in options[voice]:
+                if p < lowest:
+                    continue
+                chosen.append(p)
+                search(voice + 1, p, chosen, covered | {p % 12})
+                chosen.pop()
+
+        search(0, 0, [], frozenset())
+        return tuple(result)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _features(voicings):
+        """
+        For every voicing, the voice pairs forming a perfect fifth or octave
+        (as (lower, upper, interval class) tuples) and the number of upper
+        adjacent voices more than an octave apart.
+        """
+        features = []
+        for v in voicings:
+            perfect = frozenset(
+                (i, j, (v[j] - v[i]) % 12)
+                for i in range(len(v)) for j in range(i + 1, len(v))
+                if (v[j] - v[i]) % 12 in (0, 7))
+            wide = sum(1 for i in range(1, len(v) - 1) if v[i + 1] - v[i] > 12)
+            features.append((perfect, wide))
+        return tuple(features)
+
+    def voicings(self, chord):
+        """
+        Return every candidate voicing of `chord`, as lists of notes from the
+        bass up.
+        """
+        tones, numbers = self._tones(chord)
+        return [self._spell(v, tones)
+                for v in self._candidates(tones, numbers, self.ranges)]
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _transitions(previous, previous_features, voicings, features,
+                     parallels):
+        """
+        The cost of moving from every voicing of `previous` to every voicing
+        of `voicings`: rows[j][i] is the motion from previous[i] to
+        voicings[j], plus `parallels` per voice pair moving in parallel
+        fifths or octaves.
+
+        Voicings of a chord are cached, so progressions repeating the same
+        chord changes compute every matrix once. With NumPy, the matrix is
+        an array, computed with array operations.
+        """
+        if np is not None:
+            p = np.array(previous)
+            v = np.array(voicings)
+            rows = np.abs(v[:, None, :] - p[None, :, :]).sum(axis=2) * 1.0
+            if parallels:
+                moved = v[:, None, :] != p[None, :, :]
+                for i in range(p.shape[1]):
+                    for j in range(i + 1, p.shape[1]):
+                        a = (p[:, j] - p[:, i]) % 12
+                        b = (v[:, j] - v[:, i]) % 12
+                        rows += parallels * (
+                            ((b == 0) | (b == 7))[:, None] &
+                            (b[:, None] == a[None, :]) & moved[:, :, i])
+            return rows
+        rows = []
+        for v, (perfect, _) in zip(voicings, features):
+            row = [sum(map(abs, map(sub, prev, v))) for prev in previous]
+            if parallels:
+                for i, (prev, (prev_perfect, _)) in enumerate(
+                        zip(previous, previous_features)):
+                    common = perfect & prev_perfect
+                    if common:
+                        row[i] += parallels * sum(
+                            1 for k, _, _ in common if prev[k] != v[k])
+            rows.append(row)
+        return rows
+
+    def lead(self, chords):
+        """
+        Return the voicings of `chords` with the lowest total cost, as a list
+        containing one list of notes (from the bass up) per chord.
+        """
+        steps = []
+        # costs[j] is the cost of the best path ending on the j-th voicing
+        # of the last chord, and back[k][j] the index of the voicing of
+        # chord k - 1 on the best path to the j-th voicing of chord k
+        costs = None
+        back = []
+        previous = None
+        for chord in chords:
+            tones, numbers = self._tones(chord)
+            candidates = self._candidates(tones, numbers, self.ranges)
+            if not candidates:
+                raise ValueError('No voicing of {} fits the voice ranges'
+                                 .format(chord))
+            features = self._features(candidates)
+            wide = [self.spacing * w for _, w in features]
+            if costs is None:
+                costs = wide if np is None else np.array(wide, dtype=float)
+                back.append(None)
+            elif np is not None:
+                totals = self._transitions(previous[0], previous[1],
+                                           candidates, features,
+                                           self.parallels) + costs
+                pointers = totals.argmin(axis=1)
+                costs = totals[np.arange(len(pointers)), pointers] + wide
+                back.append(pointers.tolist())
+            else:
+                rows = self._transitions(previous[0], previous[1],
+                                         candidates, features,
+                                         self.parallels)
+                new_costs = []
+                pointers = []
+                for row, w in zip(rows, wide):
+                    totals = list(map(add, costs, row))
+                    best = min(totals)
+                    pointers.append(totals.index(best))
+                    new_costs.append(best + w)
+                costs = new_costs
+                back.append(pointers)
+            if self.beam is not None and len(costs) > self.beam:
+                keep = set(sorted(range(len(costs)),
+                                  key=costs.__getitem__)[:self.beam])
+                costs = [c if j in keep else inf
+                         for j, c in enumerate(costs)]
+                if np is not None:
+                    costs = np.array(costs)
+            previous = (candidates, features)
+            steps.append((tones, candidates))
+
+        if costs is None:
+            return []
+        costs = list(costs)
+        j = costs.index(min(costs))
+        path = []
+        for k in range(len(steps) - 1, -1, -1):
+            path.append(steps[k][1][j])
+            if back[k] is not None:
+                j = back[k][j]
+        path.reverse()
+        return [self._spell(v, tones) for v, (tones, _) in zip(path, steps)]
+
+    @staticmethod
+    def _spell(voicing, tones):
+        spelling = {pc: (idx, acc) for pc, idx, acc in tones}
+        return [Note._from_midi(p, *spelling[p % 12]) for p in voicing]
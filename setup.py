@@ -27,7 +27,8 @@ REQUIRED = [
 
 # What packages are optional?
 EXTRAS = {
-    # 'fancy feature': ['django'],
+    'audio': ['numpy'],
+    'counterpoint': ['numpy'],
 }
 
 # The rest you shouldn't have to touch too much :)
@@ -106,9 +107,9 @@ setup(
     # If your package is a single module, use this instead of 'packages':
     # py_modules=['musthe'],
 
-    # entry_points={
-    #     'console_scripts': ['mycli=mymodule:cli'],
-    # },
+    entry_points={
+        'console_scripts': ['musthe=musthe.cli:main'],
+    },
     install_requires=REQUIRED,
     extras_require=EXTRAS,
     include_package_data=True,
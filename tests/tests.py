@@ -1,6 +1,39 @@
+import random
+import threading
+import time
 import unittest
+from unittest import mock
 import json
+import os
 from musthe import Letter, Note, Scale, Chord, Interval
+from musthe.voice_leading import VoiceLeader
+from musthe.fretboard import Fretboard
+from musthe.keyfinder import KeyFinder
+from musthe.chordify import Chordifier
+from musthe.pcset import PitchClassSet, forte_numbers, prime_forms
+from musthe.tonnetz import Tonnetz
+from musthe.tuning import Tuning
+from musthe import musicxml
+from musthe.corpus import Corpus
+from musthe.live import (Transpose, SnapToScale, ChordTrigger, Processor,
+                         LoopbackPort)
+from musthe import cli
+from musthe.service import Service
+from musthe import sequence
+from musthe.sequence import NoteSequence
+from musthe.roman import RomanAnalyzer, analyze_songs
+from musthe.markov import MarkovModel, MelodyModel, ProgressionModel
+from musthe.counterpoint import CounterpointChecker
+from musthe import batch
+from musthe import engines, set_engine, get_engine
+from musthe.verify import verify
+from musthe.relations import ScaleIndex
+
+try:
+    import numpy
+    from musthe.audio import Renderer
+except ImportError:
+    numpy = None
 
 from pprint import pprint
 class TestsForLetter(unittest.TestCase):
@@ -78,6 +111,9 @@ class TestsForNote(unittest.TestCase):
                 'Gb4', 'G4', 'G#4', 'Ab4', 'A4', 'A#4', 'Bb4', 'B4', 'C5',
                 'C#5', 'Db5', 'D5', 'D#5', 'Eb5', 'E5', 'F5', 'F#5', 'Gb5',
                 'G5', 'G#5', 'Ab5', 'A5', 'A#5', 'Bb5', 'B5'])
+        self.assertEqual([str(n) for n in Note.all(accidentals=('', 'b'))],
+            ['C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B'])
+        self.assertEqual(len(list(Note.all(0, 8))), 9 * 17)
 
     def test_note_oct(self):
         def test1(n1, oc, n2):
@@ -142,6 +178,28 @@ class TestsForNote(unittest.TestCase):
         test1('A5', 880.0)
         test1('C5', 523.3)
 
+    def test_note_from_frequency(self):
+        def test1(freq, strnote, cents, **kwargs):
+            note, dev = Note.from_frequency(freq, **kwargs)
+            self.assertEqual(repr(note), 'Note({!r})'.format(strnote))
+            self.assertAlmostEqual(dev, cents, 1)
+        test1(440.0, 'A4', 0.0)
+        test1(445.0, 'A4', 19.6)
+        test1(261.63, 'C4', 0.0)
+        test1(466.16, 'Bb4', 0.0)
+        test1(466.16, 'A#4', 0.0, key=Scale('B', 'major'))
+        test1(277.18, 'Db4', 0.0, key=Scale('F', 'major'))
+        test1(246.94, 'Cb4', 0.0, key=Scale('Gb', 'major'))
+        test1(432.0, 'A4', 0.0, a4=432.0)
+        for n in Note.all(0, 9):
+            note, dev = Note.from_frequency(n.frequency())
+            self.assertEqual(note.number, n.number)
+            self.assertAlmostEqual(dev, 0.0)
+        self.assertIsNone(Note.from_frequency(0.0))
+        self.assertIsNone(Note.from_frequency(float('nan')))
+        notes = Note.from_frequencies([440.0, -1.0, 880.0])
+        self.assertEqual([x and str(x[0]) for x in notes], ['A', None, 'A'])
+
     def test_note_lilypond(self):
         def test1(n, l):
             self.assertEqual(Note(n).lilypond_notation(), l)
@@ -264,6 +322,21 @@ class TestsForChord(unittest.TestCase):
 
         self.assertRaises(TypeError, lambda: list(Chord.all(root='vdfjy#$')))
 
+        for chord in Chord.all(root=[Note('Db'), Note('B3')]):
+            self.assertEqual(chord, Chord(chord.root, chord.chord_type))
+        self.assertEqual(
+            [str(c) for c in Chord.all(2, 3, root=Note('F#'),
+                                       chord_types=['M', 'dim7'])],
+            ['F#maj', 'F#dim7', 'F#maj', 'F#dim7'])
+        self.assertEqual([c.root.octave for c in Chord.all(
+            2, 3, chord_types=['m'], accidentals=('',))], [2] * 7 + [3] * 7)
+        # chords going beyond octave 9 are skipped
+        top = [str(c) for c in Chord.all(9, 9, chord_types=['M', 'dom9'])]
+        self.assertIn('Cmaj', top)
+        self.assertNotIn('Bdom9', top)
+        self.assertRaises(ValueError, lambda: list(Chord.all(
+            chord_types=['maj13'])))
+
     def test_chord_recipes(self):
         def test1(root, name, intervals):
             r = Note(root)
@@ -292,6 +365,84 @@ class TestsForChord(unittest.TestCase):
     def test_chord_equality(self):
         self.assertNotEqual(Chord('Cdim'), Chord('Cdim7'))
 
+    def test_chord_inversions(self):
+        def test1(name, notes):
+            self.assertEqual(Chord(name).notes, [Note(n) for n in notes])
+        test1('C/E', ['E4', 'G4', 'C5'])
+        test1('CM/G', ['G4', 'C5', 'E5'])
+        test1('Cm7/Bb', ['Bb4', 'C5', 'Eb5', 'G5'])
+        test1('Cdom9/E', ['E4', 'G4', 'Bb4', 'C5', 'D5'])
+        test1('Csus4/G', ['G4', 'C5', 'F5'])
+        test1('C/C', ['C4', 'E4', 'G4'])
+
+        self.assertEqual(Chord('C/E'), Chord(Note('C'), 'maj', bass='E'))
+        self.assertEqual(Chord('C/E'), Chord(Note('C'), 'maj', inversion=1))
+        self.assertEqual(Chord('C/E'), Chord('C').inversions()[1])
+        self.assertNotEqual(Chord('C/E'), Chord('C'))
+        self.assertEqual(len(Chord('Cdim7').inversions()), 4)
+        self.assertRaises(ValueError, Chord, Note('C'), 'maj', inversion=3)
+
+    def test_slash_chords(self):
+        self.assertEqual(Chord('C/D').notes,
+                         [Note(n) for n in ('D3', 'C4', 'E4', 'G4')])
+        self.assertEqual(Chord('Am/G').notes,
+                         [Note(n) for n in ('G4', 'A4', 'C5', 'E5')])
+        self.assertEqual(str(Chord('Am/G')), 'Amin/G')
+        self.assertEqual(repr(Chord('Am/G')),
+                         'Chord({!r}, {!r}, bass={!r})'.format(Note('A'), 'min', 'G'))
+        self.assertRaises(ValueError, Chord, 'C/H')
+        # a bare root is a major chord, but a bare root with an octave
+        # is rejected, as it could be read as a power chord
+        self.assertEqual(Chord('Eb').notes, Chord('Ebmaj').notes)
+        self.assertEqual(Chord('C5maj').notes[0], Note('C5'))
+        for symbol in ('C5', 'Eb3', 'C5/E'):
+            self.assertRaises(ValueError, Chord, symbol)
+        # an added bass below a root in the lowest octave
+        self.assertEqual(Chord('C1maj/D').notes[0], Note('D0'))
+        self.assertEqual(Chord('C0maj/E').notes[0], Note('E0'))
+        with self.assertRaisesRegex(ValueError, 'no octave below 0'):
+            Chord('C0maj/D')
+
+    def test_lilypond_inversions(self):
+        self.assertEqual(Chord('C/E').lilypond_notation(), 'c/e')
+        self.assertEqual(Chord('Cm7/G').lilypond_notation(2), 'c2:m7/g')
+        self.assertEqual(Chord('C/D').lilypond_notation(4), 'c4/+d')
+
+    def test_best_matches(self):
+        def test1(notes, best):
+            matches = Chord.best_matches([Note(n) for n in notes])
+            self.assertEqual(matches[0][0], Chord(best))
+        test1(['C4', 'E4', 'G4'], 'CM')
+        test1(['C3', 'E4', 'Bb4'], 'C7')
+        test1(['E3', 'C4', 'G4'], 'CM')
+        test1(['G3', 'B3', 'D4', 'F4', 'A4', 'C5'], 'G9')
+        test1(['Db3', 'F4', 'Ab4', 'C5'], 'DbM7')
+
+        matches = Chord.best_matches([Note('A3'), Note('C4'), Note('E4')], k=3)
+        self.assertEqual(len(matches), 3)
+        self.assertEqual([score for _, score in matches],
+                         sorted((score for _, score in matches), reverse=True))
+        self.assertEqual(Chord.best_matches([]), [])
+
+    def test_neo_riemannian(self):
+        def test1(chord, transformations, result):
+            self.assertEqual(Chord(chord).transform(transformations), Chord(result))
+        test1('CM', 'P', 'Cm')
+        test1('CM', 'L', 'Em')
+        test1('CM', 'R', 'Am')
+        test1('Am', 'R', 'CM')
+        test1('Em', 'L', 'CM')
+        test1('CM', 'RL', 'FM')
+        test1('CM', 'N', 'Fm')
+        test1('CM', 'S', 'C#m')
+        test1('CM', 'H', 'Abm')
+        test1('CM', 'PP', 'CM')
+        self.assertEqual(Chord('F#m').parallel(), Chord('F#M'))
+        self.assertEqual(Chord('GM').relative(), Chord('Em'))
+        self.assertEqual(Chord('GM').leading_tone_exchange(), Chord('Bm'))
+        self.assertRaises(ValueError, Chord('C7').transform, 'P')
+        self.assertRaises(ValueError, Chord('CM').transform, 'X')
+
     def test_lilypond_base(self):
         """Tests LilyPond chord notation with no accidentals, no modifier, and
         no duration.
@@ -453,6 +604,59 @@ class TestsForScale(unittest.TestCase):
             [Chord(Note('B#4'), 'dim'), Chord(Note('B#4'), 'm7dim5')]]
         self.assertListEqual(Scale('C#', 'major').harmonize(), expected)
 
+    def test_harmonize_cached(self):
+        for scale in Scale.all(include_greek_modes=True):
+            for include_dom7 in (True, False):
+                self.assertEqual(scale.harmonize(include_dom7),
+                                 scale._harmonize_search(include_dom7))
+
+    def test_modes(self):
+        major = Scale('C', 'major')
+        for n, name in Scale.greek_modes.items():
+            mode = major.mode(n)
+            self.assertEqual(mode.notes, Scale(mode.root, name).notes)
+        self.assertEqual(str(major.mode(6)), 'A natural_minor')
+        # the first mode keeps the name of the scale
+        self.assertEqual(str(major.mode(1)), 'C major')
+        self.assertEqual(str(Scale('C', 'ionian').mode(1)), 'C ionian')
+        self.assertEqual(str(Scale('A', 'aeolian').mode(1)), 'A aeolian')
+        mode = Scale('A', 'harmonic_minor').mode(5)
+        self.assertEqual(str(mode), 'E harmonic_minor_mode5')
+        self.assertEqual([str(n) for n in mode.notes],
+                         ['E', 'F', 'G#', 'A', 'B', 'C', 'D'])
+        self.assertEqual([str(i) for i in mode.intervals],
+                         ['P1', 'm2', 'M3', 'P4', 'P5', 'm6', 'm7'])
+        self.assertEqual(str(mode.mode(3)), 'G# harmonic_minor_mode7')
+        self.assertEqual(str(mode.mode(4)), 'A harmonic_minor')
+        self.assertEqual(str(Scale('C', 'major_pentatonic').mode(5)),
+                         'A minor_pentatonic')
+        self.assertEqual(Scale(*str(mode).split()).notes, mode.notes)
+        self.assertRaises(ValueError, major.mode, 8)
+        self.assertRaises(NameError, Scale, 'C', 'major_mode8')
+        self.assertRaises(NameError, Scale, 'C', 'lydian_mode1')
+
+    def test_cache_info(self):
+        Scale.cache_clear()
+        Scale('C', 'dorian').harmonize()
+        Scale('F#', 'dorian').harmonize()
+        info = Scale.cache_info()
+        self.assertEqual(info['harmonization'].misses, 1)
+        self.assertEqual(info['harmonization'].hits, 1)
+        self.assertGreaterEqual(info['template'].hits, 2)
+
+    def test_harmonize_unspellable(self):
+        # as the original search, which spells every chord on every degree,
+        # harmonizing fails when some chord needs more than three accidentals
+        for engine in engines:
+            set_engine(engine)
+            try:
+                self.assertRaises(ValueError, Scale('Cbb', 'major').harmonize)
+                self.assertRaises(ValueError,
+                                  Scale('C##', 'major').harmonize, False)
+                self.assertTrue(Scale('Cb', 'major').harmonize())
+            finally:
+                set_engine('accelerated')
+
     def test_harmonize_no_dom7(self):
         """Tests expected results of the harmonize() method when
         dominant 7th chords are omitted.        
@@ -507,5 +711,946 @@ class TestsForScale(unittest.TestCase):
                 Chord(Note('G4'), 'open5')]}
         self.assertDictEqual(Scale('A', 'minor_pentatonic').harmonize_dict(include_dom7=False), expected)
 
+class TestsForVoiceLeader(unittest.TestCase):
+    def test_voicings(self):
+        vl = VoiceLeader()
+        voicings = vl.voicings(Chord('Cdom7'))
+        self.assertTrue(voicings)
+        for v in voicings:
+            self.assertEqual(set(str(n) for n in v), {'C', 'E', 'G', 'Bb'})
+            midi = [n.midi_note() for n in v]
+            self.assertEqual(midi, sorted(midi))
+            for n, (low, high) in zip(midi, vl.ranges):
+                self.assertTrue(low <= n <= high)
+        # the fifth is omitted when there are more chord tones than voices
+        for v in vl.voicings(Chord('Cdom9')):
+            self.assertEqual(set(str(n) for n in v), {'C', 'E', 'Bb', 'D'})
+
+    def test_lead(self):
+        vl = VoiceLeader()
+        chords = [Chord('CM'), Chord('Am'), Chord('Dm7'), Chord('G7'), Chord('CM')]
+        voicings = vl.lead(chords)
+        self.assertEqual(len(voicings), len(chords))
+        motion = sum(abs(a.midi_note() - b.midi_note())
+                     for v1, v2 in zip(voicings, voicings[1:])
+                     for a, b in zip(v1, v2))
+        self.assertLessEqual(motion, 12)
+        self.assertEqual(VoiceLeader(beam=8).lead([Chord('CM')]),
+                         vl.lead([Chord('CM')]))
+        self.assertEqual(vl.lead([]), [])
+
+    def test_parallels(self):
+        vl = VoiceLeader(voices=2, ranges=(('C3', 'C4'), ('C4', 'C5')),
+                         parallels=100.0, spacing=0)
+        v1, v2 = vl.lead([Chord('Copen5'), Chord('Dopen5')])
+        moved = [a.midi_note() != b.midi_note() for a, b in zip(v1, v2)]
+        intervals = [(v[1].midi_note() - v[0].midi_note()) % 12 for v in (v1, v2)]
+        self.assertFalse(all(moved) and intervals[0] == intervals[1] and
+                         intervals[0] in (0, 7))
+
+    @unittest.skipIf(numpy is None, 'NumPy is not installed')
+    def test_throughput(self):
+        # thousands of 32-chord progressions per minute, once the moves
+        # between the chords of the vocabulary are cached
+        vl = VoiceLeader()
+        rng = random.Random(0)
+        chords = [c[0] for c in Scale('C', 'major').harmonize(False)]
+        progressions = [[rng.choice(chords) for _ in range(32)]
+                        for _ in range(20)]
+        for p in progressions:
+            vl.lead(p)
+        start = time.perf_counter()
+        for p in progressions:
+            vl.lead(p)
+        self.assertLess(time.perf_counter() - start, 20 * 60 / 1000)
+
+    def test_bad_ranges(self):
+        self.assertRaises(ValueError, VoiceLeader, 3)
+        self.assertRaises(ValueError, VoiceLeader, 2, [('C3', 'C4')])
+        self.assertRaises(ValueError, VoiceLeader, 1, [('C4', 'C3')])
+
+
+class TestsForFretboard(unittest.TestCase):
+    def test_voicings(self):
+        guitar = Fretboard()
+        self.assertEqual(guitar.voicings(Chord('CM'))[0], (None, 3, 2, 0, 1, 0))
+        self.assertEqual(guitar.voicings(Chord('Am'))[0], (None, 0, 2, 2, 1, 0))
+        self.assertEqual(guitar.voicings(Chord('GM'))[0], (3, 2, 0, 0, 0, 3))
+        for v in guitar.voicings(Chord('Dm7')):
+            self.assertEqual(set(str(n) for n in guitar.notes(v, Chord('Dm7'))),
+                             {'D', 'F', 'A', 'C'})
+            fretted = [f for f in v if f]
+            if fretted:
+                self.assertLess(max(fretted) - min(fretted), guitar.max_span)
+            played = [s for s, f in enumerate(v) if f is not None]
+            self.assertEqual(played, list(range(played[0], played[-1] + 1)))
+
+    def test_notes(self):
+        guitar = Fretboard()
+        self.assertEqual(guitar.notes((None, 3, 2, 0, 1, 0)),
+                         [Note(n) for n in ('C3', 'E3', 'G3', 'C4', 'E4')])
+        self.assertEqual(guitar.notes((None, None, 1, 3, 4, 2), Chord('Ebm')),
+                         [Note(n) for n in ('Eb3', 'Bb3', 'Eb4', 'Gb4')])
+        # without a chord, with the default spelling
+        self.assertEqual(guitar.notes((1, 1, 1, 1, None, None)),
+                         [Note(n) for n in ('F2', 'Bb2', 'Eb3', 'G#3')])
+        self.assertEqual(guitar.positions(Note('E4')),
+                         [(2, 14), (3, 9), (4, 5), (5, 0)])
+
+    def test_tunings(self):
+        self.assertRaises(NameError, Fretboard, 'banjo')
+        ukulele = Fretboard('ukulele')
+        self.assertEqual(ukulele.voicings(Chord('CM'))[0], (0, 0, 0, 3))
+        bass = Fretboard('bass', min_strings=2)
+        self.assertTrue(bass.voicings(Chord('Eopen5')))
+
+
+class TestsForKeyFinder(unittest.TestCase):
+    def test_push(self):
+        kf = KeyFinder()
+        self.assertEqual(kf.estimate(), (None, 0.0))
+        for note in Scale('G', 'major')[0:8]:
+            key, confidence = kf.push(note)
+        self.assertEqual(str(key), 'G major')
+        self.assertGreater(confidence, 0.8)
+        self.assertEqual(kf.correlations()[0][0], key)
+
+        kf = KeyFinder()
+        for note in Chord('Cm').notes + Chord('G7').notes + Chord('Cm').notes:
+            key, confidence = kf.push(note)
+        self.assertEqual(str(key), 'C natural_minor')
+
+    def test_window(self):
+        kf = KeyFinder(window=8)
+        notes = Scale('A', 'major')[0:8] + Scale('Eb', 'major')[0:8]
+        estimates = list(kf.feed(notes))
+        self.assertEqual(str(estimates[7][0]), 'A major')
+        self.assertEqual(str(estimates[-1][0]), 'Eb major')
+
+        # the incrementally updated histogram matches the window contents
+        fresh = KeyFinder(window=8)
+        for note in notes[-8:]:
+            fresh.push(note)
+        for (k1, r1), (k2, r2) in zip(kf.correlations(), fresh.correlations()):
+            self.assertAlmostEqual(r1, r2)
+
+    def test_durations(self):
+        kf = KeyFinder()
+        events = [(Note('D'), 4.0), (Note('F#'), 1.0), (Note('A'), 2.0),
+                  (Note('E'), 0.5), (Note('C#'), 0.5), (Note('D'), 4.0)]
+        key, confidence = list(kf.feed(events))[-1]
+        self.assertEqual(str(key), 'D major')
+
+    def test_scales(self):
+        kf = KeyFinder(scales=('harmonic_minor',))
+        self.assertEqual(len(kf.keys), 12)
+        self.assertRaises(NameError, KeyFinder, 8, ('nonexistent',))
+        self.assertRaises(ValueError, KeyFinder, 0)
+
+
+class TestsForChordifier(unittest.TestCase):
+    def test_segments(self):
+        c = Chordifier()
+        events = [(0, Note('C4'), True), (0, Note('E4'), True),
+                  (0, Note('G4'), True), (1, Note('C5'), True),
+                  (2, Note('C4'), False), (2, Note('B3'), True),
+                  (3, Note('C5'), False), (4, Note('B3'), False),
+                  (4, Note('E4'), False), (4, Note('G4'), False)]
+        segments = list(c.feed(events)) + c.flush(5)
+        self.assertEqual(segments, [(0, 2, Chord('CM')),
+                                    (2, 3, Chord('Cmaj7')),
+                                    (3, 4, Chord('Em')),
+                                    (4, 5, None)])
+
+    def test_midi_and_ambiguity(self):
+        c = Chordifier()
+        for midi in (48, 52, 56):
+            c.note_on(midi, 0)
+        self.assertEqual(c.flush(1), [(0, 1, Chord('Caug'))])
+        c = Chordifier()
+        for midi in (52, 56, 60):
+            c.note_on(midi, 0)
+        self.assertEqual(c.flush(1), [(0, 1, Chord('Eaug'))])
+
+    def test_spelling(self):
+        c = Chordifier()
+        for note in ('Db4', 'F4', 'Ab4'):
+            c.note_on(Note(note), 0)
+        self.assertEqual(str(c.flush(1)[0][2]), 'Dbmaj')
+        self.assertRaises(ValueError, c.note_off, Note('C4'), 2)
+
+
+class TestsForPitchClassSet(unittest.TestCase):
+    def test_forms(self):
+        def test1(collection, normal, prime, forte, vector):
+            s = PitchClassSet(collection)
+            self.assertEqual(s.normal_form(), normal)
+            self.assertEqual(s.prime_form(), prime)
+            self.assertEqual(s.forte_number(), forte)
+            self.assertEqual(s.interval_vector(), vector)
+        test1(Chord('CM'), (0, 4, 7), (0, 3, 7), '3-11', (0, 0, 1, 1, 1, 0))
+        test1(Chord('Cm'), (0, 3, 7), (0, 3, 7), '3-11', (0, 0, 1, 1, 1, 0))
+        test1(Chord('C7'), (4, 7, 10, 0), (0, 2, 5, 8), '4-27', (0, 1, 2, 1, 1, 1))
+        test1(Chord('Cdim7'), (0, 3, 6, 9), (0, 3, 6, 9), '4-28', (0, 0, 4, 0, 0, 2))
+        test1(Scale('C', 'major'), (11, 0, 2, 4, 5, 7, 9),
+              (0, 1, 3, 5, 6, 8, 10), '7-35', (2, 5, 4, 3, 6, 1))
+        test1([0, 1, 4, 6], (0, 1, 4, 6), (0, 1, 4, 6), '4-Z15', (1, 1, 1, 1, 1, 1))
+        test1([0, 1, 3, 7, 8], (7, 8, 0, 1, 3), (0, 1, 5, 6, 8), '5-20', (2, 1, 1, 2, 3, 1))
+        test1([], (), (), None, (0, 0, 0, 0, 0, 0))
+
+    def test_set_classes(self):
+        # every set maps to one of the 223 Forte set classes
+        names = set(forte_numbers(range(1, 4096)))
+        self.assertEqual(len(names), 223)
+        for mask in range(1, 4096):
+            s = PitchClassSet.from_mask(mask)
+            self.assertEqual(s.transpose(5).prime_form(), s.prime_form())
+            self.assertEqual(s.invert().forte_number(), s.forte_number())
+
+    def test_notes(self):
+        s = PitchClassSet([Note('E'), Note('G#'), Note('B'), Note('D')])
+        self.assertEqual(s.notes(), [Note(n) for n in ('G#4', 'B4', 'D5', 'E5')])
+        self.assertEqual(PitchClassSet(s.notes()), s)
+        self.assertTrue(Note('Ab2') in s)
+        self.assertEqual(len(s), 4)
+        self.assertEqual(prime_forms([Chord('CM'), 0b10001001]), [(0, 3, 7)] * 2)
+        self.assertRaises(ValueError, prime_forms, [-1])
+        self.assertRaises(ValueError, forte_numbers, [0b10001001, 4096])
+        self.assertRaises(TypeError, PitchClassSet, ['C'])
+
+
+class TestsForTonnetz(unittest.TestCase):
+    def test_paths(self):
+        t = Tonnetz.shared()
+        self.assertIs(t, Tonnetz.shared())
+        self.assertEqual(t.path(Chord('CM'), Chord('CM')), '')
+        self.assertEqual(t.path(Chord('CM'), Chord('Am')), 'R')
+        self.assertEqual(t.distance(Chord('CM'), Chord('EbM')), 2)
+        for a in Chord.all(root=[Note('C'), Note('F#')]):
+            if a.chord_type not in ('maj', 'min'):
+                continue
+            for b in Chord.all():
+                if b.chord_type not in ('maj', 'min'):
+                    continue
+                c = a.transform(t.path(a, b))
+                self.assertEqual(c.root.number % 12, b.root.number % 12)
+                self.assertEqual(c.chord_type, b.chord_type)
+
+    def test_transformations(self):
+        plr = Tonnetz.shared('PLR')
+        extended = Tonnetz.shared('PLRNSH')
+        self.assertEqual(extended.path(Chord('CM'), Chord('Abm')), 'H')
+        self.assertLessEqual(extended.distance(Chord('CM'), Chord('F#M')),
+                             plr.distance(Chord('CM'), Chord('F#M')))
+        self.assertIsNone(Tonnetz('P').path(Chord('CM'), Chord('DM')))
+        chords = plr.chord_path(Chord('CM'), Chord('EbM'))
+        self.assertEqual(chords[0], Chord('CM'))
+        self.assertEqual(str(chords[-1]), 'Ebmaj')
+        self.assertEqual(len(plr.neighbors(Chord('CM'))), 3)
+        self.assertRaises(ValueError, Tonnetz, 'PX')
+        self.assertRaises(ValueError, plr.path, Chord('C7'), Chord('CM'))
+
+
+class TestsForTuning(unittest.TestCase):
+    def test_systems(self):
+        equal = Tuning()
+        for n in Note.all(0, 9):
+            self.assertAlmostEqual(n.frequency(tuning=equal), n.frequency())
+        just = Tuning('just', tonic='C')
+        c = Note('C4').frequency(just)
+        for note, ratio in [('D4', 9 / 8.), ('E4', 5 / 4.), ('F4', 4 / 3.),
+                            ('G4', 3 / 2.), ('A4', 5 / 3.), ('B4', 15 / 8.),
+                            ('Bb4', 9 / 5.), ('C5', 2.)]:
+            self.assertAlmostEqual(Note(note).frequency(just) / c, ratio)
+        self.assertAlmostEqual(Note('A4').frequency(just), 440.0)
+        pythagorean = Tuning('pythagorean', tonic='D', a4=432.0)
+        self.assertAlmostEqual(Note('A4').frequency(pythagorean), 432.0)
+        self.assertAlmostEqual(Note('A3').frequency(pythagorean) /
+                               Note('D3').frequency(pythagorean), 1.5)
+        meantone = Tuning('meantone')
+        self.assertAlmostEqual(Note('E4').frequency(meantone) /
+                               Note('C4').frequency(meantone), 1.25)
+        self.assertLess(Note('C#4').frequency(meantone),
+                        Note('Db4').frequency(meantone))
+        a4, a5 = just.frequencies([Note('A4'), Note('A5')])
+        self.assertAlmostEqual(a4, 440.0)
+        self.assertAlmostEqual(a5, 880.0)
+        self.assertRaises(NameError, Tuning, 'werckmeister')
+
+    def test_scala(self):
+        import io
+        scl = io.StringIO('''! pentatonic.scl
+!
+Pentatonic scale
+ 5
+!
+ 9/8
+ 5/4
+ 701.955 fifth
+ 5/3
+ 2/1
+''')
+        t = Tuning.from_scala(scl, tonic='A')
+        self.assertAlmostEqual(Note('A4').frequency(t), 440.0)
+        # chromatic steps above the tonic are mapped to scale degrees
+        self.assertAlmostEqual(Note('A#4').frequency(t), 495.0)
+        self.assertAlmostEqual(Note('C5').frequency(t), 660.0, 2)
+        self.assertAlmostEqual(Note('D5').frequency(t), 880.0)
+        self.assertAlmostEqual(Note('G4').frequency(t), 330.0, 2)
+        self.assertRaises(ValueError, Tuning.from_scala,
+                          io.StringIO('! bad\nBad\n 3\n 9/8\n'))
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class TestsForRenderer(unittest.TestCase):
+    def test_render(self):
+        r = Renderer(sample_rate=8000, release=0.05, block=1000)
+        blocks = list(r.render([(0.0, 1.0, Note('A4'))]))
+        self.assertTrue(all(len(b) <= 1000 for b in blocks))
+        signal = numpy.concatenate(blocks)
+        self.assertEqual(len(signal), 8400)
+        spectrum = numpy.abs(numpy.fft.rfft(signal[:8000]))
+        self.assertEqual(numpy.argmax(spectrum), 440)
+        self.assertLessEqual(numpy.abs(signal).max(), 0.2)
+        self.assertAlmostEqual(signal[-1], 0.0, 2)
+        self.assertRaises(ValueError, list,
+                          r.render([(1.0, 1.0, None), (0.0, 1.0, None)]))
+        self.assertEqual(sum(map(len, r.render([(0.5, 1.0, None)]))), 12000)
+        self.assertEqual(list(r.render([])), [])
+        self.assertRaises(NameError, Renderer, waveform='noise')
+
+    def test_write(self):
+        import os
+        import tempfile
+        import wave
+        r = Renderer(sample_rate=8000, waveform='sawtooth', release=0.1)
+        fd, filename = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        try:
+            events = r.sequence([(Chord('CM'), 1), (None, 1), (Note('G4'), 2)],
+                                tempo=120)
+            frames = r.write(filename, events)
+            self.assertEqual(frames, 8000 * 2 + 800)
+            with wave.open(filename, 'rb') as f:
+                self.assertEqual(f.getnchannels(), 1)
+                self.assertEqual(f.getsampwidth(), 2)
+                self.assertEqual(f.getframerate(), 8000)
+                self.assertEqual(f.getnframes(), frames)
+                data = numpy.frombuffer(f.readframes(frames), '<i2')
+            # the rest is silent once the chord is released
+            self.assertEqual(numpy.abs(data[5000:8000]).max(), 0)
+        finally:
+            os.remove(filename)
+
+
+class TestsForMusicXML(unittest.TestCase):
+    score = b'''<?xml version="1.0" encoding="UTF-8"?>
+<score-partwise version="3.1">
+  <part-list>
+    <score-part id="P1"><part-name>Piano</part-name></score-part>
+  </part-list>
+  <part id="P1">
+    <measure number="1">
+      <attributes><divisions>2</divisions></attributes>
+      <harmony>
+        <root><root-step>C</root-step></root>
+        <kind>major</kind>
+        <bass><bass-step>E</bass-step></bass>
+      </harmony>
+      <note><pitch><step>C</step><octave>4</octave></pitch>
+        <duration>2</duration></note>
+      <note><chord/><pitch><step>E</step><octave>4</octave></pitch>
+        <duration>2</duration></note>
+      <note><rest/><duration>1</duration></note>
+      <note><pitch><step>B</step><alter>-1</alter><octave>3</octave></pitch>
+        <duration>1</duration></note>
+      <backup><duration>4</duration></backup>
+      <note><pitch><step>F</step><alter>1</alter><octave>2</octave></pitch>
+        <duration>4</duration></note>
+    </measure>
+    <measure number="2">
+      <harmony>
+        <root><root-step>G</root-step></root>
+        <kind>dominant</kind>
+        <offset>2</offset>
+      </harmony>
+      <note><pitch><step>G</step><octave>4</octave></pitch>
+        <duration>8</duration></note>
+    </measure>
+  </part>
+</score-partwise>
+'''
+
+    def test_parse(self):
+        import io
+        from fractions import Fraction
+        events = list(musicxml.parse(io.BytesIO(self.score)))
+        self.assertEqual(
+            [(p, t, d, item if item is None else repr(item))
+             for p, t, d, item in events],
+            [('P1', 0, None, "Chord(Note('C4'), 'maj', bass='E')"),
+             ('P1', 0, 1, "Note('C4')"),
+             ('P1', 0, 1, "Note('E4')"),
+             ('P1', 1, Fraction(1, 2), None),
+             ('P1', Fraction(3, 2), Fraction(1, 2), "Note('Bb3')"),
+             ('P1', 0, 2, "Note('F#2')"),
+             ('P1', 3, None, "Chord(Note('G4'), 'dom7')"),
+             ('P1', 2, 4, "Note('G4')")])
+        self.assertRaises(ValueError, list, musicxml.parse(
+            io.BytesIO(b'<score-timewise></score-timewise>')))
+
+    def test_long_score(self):
+        import io
+        measure = (b'<measure><note><pitch><step>A</step><octave>4</octave>'
+                   b'</pitch><duration>1</duration></note></measure>')
+        score = (b'<score-partwise><part id="P1">' + measure * 5000 +
+                 b'</part></score-partwise>')
+        times = [t for _, t, _, _ in musicxml.parse(io.BytesIO(score))]
+        self.assertEqual(times, list(range(5000)))
+
+    def test_mxl(self):
+        import os
+        import tempfile
+        import zipfile
+        fd, filename = tempfile.mkstemp(suffix='.mxl')
+        os.close(fd)
+        try:
+            with zipfile.ZipFile(filename, 'w') as z:
+                z.writestr('META-INF/container.xml',
+                           '<container><rootfiles>'
+                           '<rootfile full-path="score.xml"/>'
+                           '</rootfiles></container>')
+                z.writestr('score.xml', self.score)
+            events = list(musicxml.parse(filename))
+            self.assertEqual(len(events), 8)
+            with zipfile.ZipFile(filename, 'w') as z:
+                z.writestr('META-INF/container.xml', '<container/>')
+            self.assertRaises(ValueError, list, musicxml.parse(filename))
+        finally:
+            os.remove(filename)
+
+
+class TestsForCorpus(unittest.TestCase):
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, 'scores')
+        os.mkdir(self.directory)
+        for i in range(5):
+            self.add('{}.musicxml'.format(i), TestsForMusicXML.score)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def add(self, name, data):
+        with open(os.path.join(self.directory, name), 'wb') as f:
+            f.write(data)
+
+    def test_run(self):
+        note = ('<note>{}<pitch><step>{}</step><octave>4</octave></pitch>'
+                '<duration>4</duration></note>')
+        triad = ''.join(note.format(chord, step)
+                        for chord, step in [('', 'C'), ('<chord/>', 'E'),
+                                            ('<chord/>', 'G')])
+        self.add('triad.xml', '<score-partwise><part id="P1"><measure>{}'
+                 '</measure></part></score-partwise>'.format(triad).encode())
+        results = Corpus(self.directory, jobs=1, chunk_size=2).run()
+        self.assertEqual(results['intervals'], {'A4': 5, 'M6': 5})
+        self.assertEqual(results['chords'], {'maj': 4.0})
+        self.assertEqual(results['chord_symbols'], {'maj': 5, 'dom7': 5})
+        self.assertEqual(results['keys']['G major'], 5)
+        self.assertEqual(sum(results['keys'].values()), 6)
+        self.assertEqual(Corpus(self.directory, jobs=2).run(), results)
+        self.assertRaises(NameError, Corpus, self.directory, ['modes'])
+
+    def test_resume(self):
+        checkpoint = os.path.join(self.tmp.name, 'checkpoint.json')
+        corpus = Corpus(self.directory, ['intervals'], jobs=1, chunk_size=2,
+                        checkpoint=checkpoint)
+        self.assertEqual(corpus.run()['intervals']['M6'], 5)
+        self.add('5.musicxml', TestsForMusicXML.score)
+        self.add('bad.xml', b'<score-partwise><part>')
+        corpus = Corpus(self.directory, ['intervals'], jobs=1,
+                        checkpoint=checkpoint)
+        self.assertEqual(len(corpus.done), 5)
+        self.assertEqual(corpus.run()['intervals']['M6'], 6)
+        self.assertEqual(list(corpus.errors), [
+            os.path.join(self.directory, 'bad.xml')])
+        self.assertRaises(ValueError, Corpus, self.directory, ['keys'],
+                          checkpoint=checkpoint)
+
+
+class TestsForLive(unittest.TestCase):
+    def test_filters(self):
+        self.assertEqual(Transpose('P5')(60), (67,))
+        self.assertEqual(Transpose(Interval('M3'), down=True)(60), (56,))
+        self.assertEqual(Transpose('P8')(120), ())
+        snap = SnapToScale(Scale('C', 'major'))
+        self.assertEqual([snap(n)[0] for n in range(60, 72)],
+                         [60, 60, 62, 62, 64, 65, 65, 67, 67, 69, 69, 71])
+        self.assertEqual(ChordTrigger('m7')(60), (60, 63, 67, 70))
+        diatonic = ChordTrigger(scale=Scale('C', 'major'))
+        self.assertEqual(diatonic(62), (62, 65, 69))
+        self.assertEqual(diatonic(71), (71, 74, 77))
+        self.assertEqual(diatonic(61), (61,))
+        self.assertEqual((snap | diatonic)(61), (60, 64, 67))
+        self.assertRaises(ValueError, ChordTrigger, 'xyz')
+
+    def test_processor(self):
+        import asyncio
+
+        async def main(messages):
+            inp, out = LoopbackPort(), LoopbackPort()
+            processor = Processor(SnapToScale(Scale('C', 'major')), inp, out)
+            for message in messages:
+                await inp.send(message)
+            inp.close()
+            await processor.run()
+            received = []
+            while True:
+                item = await out.receive()
+                if item is None:
+                    return processor, received
+                received.append(item[0])
+
+        processor, received = asyncio.run(main([
+            (0x90, 60, 100), (0x90, 61, 90), (0xc0, 5), (0x80, 60, 0),
+            (0x91, 60, 80), (0x90, 61, 0)]))
+        # C# is snapped to C, already sounding: C is off when both are off
+        self.assertEqual(received, [(0x90, 60, 100), (0xc0, 5),
+                                    (0x91, 60, 80), (0x90, 60, 0)])
+        self.assertEqual(processor.latency.total, 6)
+        self.assertIsNotNone(processor.latency.percentile(99))
+        self.assertLessEqual(processor.latency.percentile(50),
+                             processor.latency.percentile(99))
+
+
+class TestsForCLI(unittest.TestCase):
+    def run_cli(self, args, queries):
+        import contextlib
+        import io
+        import tempfile
+        with tempfile.NamedTemporaryFile('w', suffix='.txt',
+                                         delete=False) as f:
+            f.write('\n'.join(queries) + '\n')
+        try:
+            out = io.StringIO()
+            with contextlib.redirect_stdout(out):
+                status = cli.main(args + [f.name])
+        finally:
+            os.remove(f.name)
+        return status, out.getvalue().splitlines()
+
+    def test_commands(self):
+        def test1(args, queries, results):
+            status, lines = self.run_cli(args, queries)
+            self.assertEqual(status, 0)
+            self.assertEqual(lines, results)
+        test1(['transpose'], ['C4 M3', 'B3 m10'], ['E4', 'D5'])
+        test1(['transpose', '--down'], ['E4 M3'], ['C4'])
+        test1(['interval'], ['C4 E4', 'G4 C4'], ['M3', 'P5'])
+        test1(['chord', 'parse'], ['C/E'], ['E4 G4 C5'])
+        test1(['chord', 'identify'], ['C E G', 'D F# A C'],
+              ['Cmaj', 'Ddom7'])
+        test1(['scale', 'contains', 'C major'], ['C E', 'Dm G7', 'F#'],
+              ['yes', 'yes', 'no'])
+        test1(['scale', 'find'], ['Cm Fm7 Gm'], ['C natural_minor, Eb major'])
+        test1(['harmonize'], ['C major'],
+              ['Cmaj Dmin Emin Fmaj Gmaj Amin Bdim'])
+
+    def test_errors_and_jobs(self):
+        status, lines = self.run_cli(['transpose'], ['C4', 'C4 P5'])
+        self.assertEqual(status, 1)
+        self.assertTrue(lines[0].startswith('error:'))
+        self.assertEqual(lines[1], 'G4')
+        queries = ['{} P5'.format(n.scientific_notation())
+                   for n in Note.all(1, 7)]
+        self.assertEqual(self.run_cli(['--jobs', '2', 'transpose'], queries),
+                         self.run_cli(['transpose'], queries))
+
+
+class TestsForService(unittest.TestCase):
+    def test_query(self):
+        import asyncio
+
+        async def main():
+            service = Service(batch_delay=0.01)
+            transpose = {'note': 'C4', 'interval': 'P5'}
+            results = await asyncio.gather(
+                service.query('transpose', transpose),
+                service.query('transpose', dict(transpose)),
+                service.query('transpose', {'note': 'E4', 'interval': 'm3'}),
+                service.query('chord.identify', {'notes': ['D', 'F#', 'A']}))
+            self.assertEqual(results[:3], ['G4', 'G4', 'G4'])
+            self.assertEqual(results[3], [{'chord': 'Dmaj', 'score': 3.5}])
+            self.assertEqual(service.stats['coalesced'], 1)
+            self.assertEqual(service.stats['batches'], 2)
+            self.assertEqual(await service.query('transpose', transpose), 'G4')
+            self.assertEqual(service.stats['hits'], 1)
+            # a batch mixing intervals, directions and a failing query
+            results = await asyncio.gather(
+                service.query('transpose', {'note': 'D4', 'interval': 'M3'}),
+                service.query('transpose', {'note': 'D4', 'interval': 'M3',
+                                            'down': True}),
+                service.query('transpose', {'note': 'C0', 'interval': 'M3',
+                                            'down': True}),
+                service.query('transpose', {'note': 'A4', 'interval': 'm2'}),
+                return_exceptions=True)
+            self.assertEqual(results[:2], ['F#4', 'Bb3'])
+            self.assertIsInstance(results[2], ValueError)
+            self.assertEqual(results[3], 'Bb4')
+            # cached failures raise a new exception every time
+            errors = []
+            for _ in range(2):
+                with self.assertRaises(ValueError) as cm:
+                    await service.query('transpose', {'note': 'H4',
+                                                      'interval': 'P5'})
+                errors.append(cm.exception)
+            self.assertIsNot(errors[0], errors[1])
+            self.assertEqual(str(errors[0]), str(errors[1]))
+            self.assertEqual(service.stats['hits'], 2)
+            with self.assertRaises(ValueError):
+                await service.query('modulate', {})
+            self.assertEqual(
+                await service.query('scale.find', {'items': ['Cm', 'Gm']}),
+                ['C natural_minor', 'Eb major', 'G natural_minor',
+                 'G harmonic_minor', 'Bb major'])
+
+        asyncio.run(main())
+        self.assertRaises(ValueError, Service, host='0.0.0.0')
+
+    def test_http(self):
+        import asyncio
+
+        async def request(port, data):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'POST /query HTTP/1.1\r\nConnection: close\r\n'
+                         b'Content-Length: ' + str(len(data)).encode() +
+                         b'\r\n\r\n' + data)
+            response = await reader.read()
+            writer.close()
+            head, _, body = response.partition(b'\r\n\r\n')
+            return head.split()[1], json.loads(body)
+
+        async def main():
+            service = Service()
+            await service.start()
+            try:
+                status, body = await request(service.port, json.dumps([
+                    {'op': 'chord.parse', 'params': {'chord': 'C/E'}},
+                    {'op': 'harmonize', 'params': {'scale': 'A blues'}},
+                ]).encode())
+                self.assertEqual(status, b'200')
+                self.assertEqual(body[0], ['E4', 'G4', 'C5'])
+                self.assertIn('error', body[1])
+                status, body = await request(service.port, b'{')
+                self.assertEqual(status, b'400')
+            finally:
+                await service.close()
+
+        asyncio.run(main())
+
+
+class TestsForNoteSequence(unittest.TestCase):
+    def test_transpose(self):
+        notes = list(Note.all(2, 7)) + [Note('B#4'), Note('G##3'),
+                                        Note('Fbb4')]
+        seq = NoteSequence.from_notes(notes)
+        self.assertEqual(seq.to_notes(), notes)
+        # with NumPy if installed, and with the pure-Python fallback
+        for np in {sequence.np, None}:
+            with mock.patch.object(sequence, 'np', np):
+                for interval in ['m2', 'M3', 'd5', 'P8', 'M10', 'A4']:
+                    interval = Interval(interval)
+                    self.assertEqual(seq.transpose(interval).to_notes(),
+                                     [n + interval for n in notes])
+                    self.assertEqual(
+                        seq.transpose(interval, down=True).to_notes(),
+                        [n - interval for n in notes])
+                self.assertEqual(seq[::2].transpose('P5').to_notes(),
+                                 [n + Interval('P5') for n in notes[::2]])
+                self.assertRaises(ValueError, NoteSequence.from_notes(
+                    [Note('C0')]).transpose, 'm2', True)
+                self.assertRaises(ValueError, NoteSequence.from_notes(
+                    [Note('D1')]).transpose, 'M9', True)
+
+    def test_intervals(self):
+        seq = NoteSequence.from_notes(
+            [Note('C4'), Note('E4'), Note('G3'), Note('G3'), Note('B#3'),
+             Note('D5')])
+        self.assertEqual([str(i) for i in seq.intervals()],
+                         ['M3', 'M6', 'P1', 'A3', 'd10'])
+        self.assertEqual(list(seq.semitones()), [4, -9, 0, 5, 14])
+        self.assertEqual(list(seq.midi_notes()), [60, 64, 55, 55, 60, 74])
+
+    def test_views_and_conversions(self):
+        seq = NoteSequence.from_midi([60, 63, 66, 70], onsets=[0, 1, 2, 3],
+                                     durations=[1, 1, 1, 2])
+        self.assertEqual([str(n) for n in seq], ['C', 'Eb', 'F#', 'Bb'])
+        tail = seq[2:]
+        self.assertEqual(len(tail), 2)
+        self.assertEqual(tail[0], Note('F#4'))
+        self.assertIs(tail.octave.obj, seq.octave.obj)
+        self.assertEqual(tail.lilypond_notation(), "fis'4 bes'2")
+        self.assertEqual(seq[::3], NoteSequence.from_notes(
+            [Note('C4'), Note('Bb4')], [0, 3], [1, 2]))
+        events = seq[:2].note_events()
+        self.assertEqual(events, [(0, 60, True), (1, 60, False),
+                                  (1, 63, True), (2, 63, False)])
+        self.assertEqual(list(Chordifier().feed(
+            NoteSequence.from_notes([Note('C4'), Note('E4'), Note('G4')],
+                                    [0, 0, 0], [2, 2, 2]).note_events())),
+                         [(0, 2, Chord('CM'))])
+        self.assertRaises(ValueError, NoteSequence, [0], [4], [4])
+        self.assertRaises(ValueError, NoteSequence, [0, 1], [0], [4])
+
+
+class TestsForRomanAnalyzer(unittest.TestCase):
+    def test_major(self):
+        def test1(chord, label):
+            self.assertEqual(analyzer.label(Chord(chord)), label)
+        analyzer = RomanAnalyzer('C major')
+        test1('CM', 'I')
+        test1('Dm7', 'ii7')
+        test1('G7', 'V7')
+        test1('Bdim', 'vii°')
+        test1('Bm7b5', 'viiø7')
+        test1('C/E', 'I6')
+        test1('C/G', 'I64')
+        test1('G7/B', 'V65')
+        test1('G7/F', 'V42')
+        test1('D7', 'V7/V')
+        test1('E', 'V/vi')
+        test1('F#dim7', 'vii°7/V')
+        test1('Fm', 'iv')
+        test1('Ab', 'bVI')
+        test1('Bb', 'bVII')
+        test1('Db', 'bII')
+        test1('F#m', None)
+        self.assertEqual(RomanAnalyzer(Scale('Eb', 'major')).analyze(
+            [Chord('EbM'), Chord('Cm'), Chord('Ab'), Chord('Bb7'),
+             Chord('Cb')]), ['I', 'vi', 'IV', 'V7', 'bVI'])
+
+    def test_minor(self):
+        analyzer = RomanAnalyzer(Scale('A', 'natural_minor'))
+        self.assertEqual(analyzer.analyze(
+            [Chord('Am'), Chord('Dm'), Chord('E7'), Chord('G#dim7'),
+             Chord('C'), Chord('G'), Chord('B7'), Chord('Bb')]),
+            ['i', 'iv', 'V7', 'vii°7', 'III', 'VII', 'V7/V', 'bII'])
+        self.assertRaises(ValueError, RomanAnalyzer, 'C major_pentatonic')
+
+    def test_songs(self):
+        songs = [('C major', [Chord('CM'), Chord('G7')]),
+                 ('G major', [Chord('D7'), Chord('GM')])] * 10
+        self.assertEqual(analyze_songs(songs), [['I', 'V7'], ['V7', 'I']] * 10)
+        self.assertEqual(analyze_songs(songs, jobs=2), analyze_songs(songs))
+
+
+class TestsForMarkov(unittest.TestCase):
+    def test_walk(self):
+        m = MarkovModel(order=1)
+        self.assertRaises(ValueError, list, m.walk(random.Random(0), 1))
+        m.train(['abc'] * 5)
+        self.assertEqual(''.join(m.walk(random.Random(0), 3)), 'abc')
+        # 'c' is never followed by anything: back off to the symbol counts
+        self.assertTrue(set(m.walk(random.Random(0), 20)) <= set('abc'))
+        self.assertEqual(list(m.walk(random.Random(4), 10)),
+                         list(m.walk(random.Random(4), 10)))
+
+    def test_melody(self):
+        melody = NoteSequence.from_notes(
+            [Note('C4'), Note('E4'), Note('G4'), Note('C5')],
+            [0, 1, 2, 3], [1, 1, 1, 2])
+        m = MelodyModel(order=3)
+        m.train([('C major', melody)])
+        melodies = list(m.generate('Eb major', 4, count=2, seed=1))
+        self.assertEqual(len(melodies), 2)
+        self.assertEqual(melodies[0].to_notes(), [Note('Eb4'), Note('G4'),
+                                                   Note('Bb4'), Note('Eb5')])
+        self.assertEqual(list(melodies[0].onset), [0, 1, 2, 3])
+        self.assertEqual(list(melodies[0].duration), [1, 1, 1, 2])
+
+    def test_progression(self):
+        m = ProgressionModel(order=2)
+        m.train([('C major', [Chord('CM'), Chord('Am'), Chord('Dm'),
+                              Chord('G7')])])
+        chords = m.generate('F major', seed=0)
+        self.assertEqual([str(next(chords)) for _ in range(4)],
+                         ['Fmaj', 'Dmin', 'Gmin', 'Cdom7'])
+        # nothing followed G7: back off to the chord counts
+        self.assertIn(str(next(chords)), ['Fmaj', 'Dmin', 'Gmin', 'Cdom7'])
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class TestsForCounterpointChecker(unittest.TestCase):
+    def test_parallels(self):
+        checker = CounterpointChecker(key='C major')
+        report = checker.check([['C3', 'D3'], ['G3', 'A3'], ['E4', 'F4'],
+                                ['C5', 'D5']])
+        self.assertEqual(report['parallel_fifths'], [(0, (0, 1))])
+        self.assertEqual(report['parallel_octaves'], [(0, (0, 3))])
+        self.assertEqual(report['voice_crossing'], [])
+        # contrary motion and oblique motion are fine
+        report = checker.check([[48, 43], [55, 55], [64, 64], [72, 79]])
+        self.assertEqual(report['parallel_fifths'], [])
+        self.assertEqual(report['parallel_octaves'], [])
+
+    def test_other_rules(self):
+        checker = CounterpointChecker(key='G major')
+        report = checker.check([
+            [Note('G2'), Note('G2'), Note('D3')],
+            NoteSequence.from_notes([Note('D3'), Note('B3'), Note('A3')]),
+            [Note('B3'), Note('A3'), Note('F#4')],
+            [Note('G4'), Note('F#5'), Note('A5')]])
+        self.assertEqual(report['voice_crossing'], [(1, (1, 2))])
+        self.assertEqual(report['spacing'], [(1, (2, 3)), (2, (2, 3))])
+        self.assertEqual(report['range'], [(2, (3,))])
+        self.assertEqual(report['leading_tone'], [(1, (3,))])
+        self.assertRaises(ValueError, checker.check, [[40]] * 3)
+        self.assertRaises(ValueError, checker.check, [[40]] * 3 + [[40, 41]])
+        self.assertRaises(ValueError, CounterpointChecker, 3,
+                          VoiceLeader.satb_ranges)
+
+
+class TestsForBatch(unittest.TestCase):
+    def test_operations(self):
+        notes = list(Note.all(3, 5))
+        self.assertEqual(batch.transpose(notes, 'M3', jobs=4, chunk_size=5),
+                         [n + Interval('M3') for n in notes])
+        self.assertEqual(batch.transpose(['E4', 'C5'], 'P4', down=True),
+                         [Note('B3'), Note('G4')])
+        chords = [['C', 'E', 'G'], ['D', 'F#', 'A', 'C'], ['B', 'D', 'F']]
+        self.assertEqual(
+            [str(m[0][0]) for m in batch.identify(chords * 20, jobs=3)],
+            ['Cmaj', 'Ddom7', 'Bdim'] * 20)
+        scales = ['C major', Scale('A', 'natural_minor'), 'D dorian'] * 5
+        self.assertEqual(batch.harmonize(scales, jobs=4, chunk_size=2),
+                         batch.harmonize(scales, jobs=1))
+
+    def test_shared_cache(self):
+        fretboard = Fretboard()
+        results = []
+
+        def worker():
+            results.append(fretboard.voicings(Chord('Am7')))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertTrue(all(r == results[0] for r in results))
+        self.assertEqual(len(fretboard._cache), 1)
+
+    def test_core_caches(self):
+        def work():
+            return ([str(n) for n in Note.all(3, 4)],
+                    [str(Chord(n, t)) for n in Note.all() for t in ('m7', 'dim')],
+                    [str(m[0][0]) for m in map(Chord.best_matches,
+                                               [[Note('C'), Note('Eb'), Note('G')],
+                                                [Note('B'), Note('D'), Note('F')]])],
+                    [str(s.mode(2)) for s in Scale.all()],
+                    [[str(c[0]) for c in Scale(n, 'dorian').harmonize() if c]
+                     for n in Note.all()])
+
+        # start from empty caches, filled by all the threads at once
+        for cls in (Note, Interval, Chord, Scale):
+            for name in dir(cls):
+                clear = getattr(getattr(cls, name), 'cache_clear', None)
+                if clear is not None and name != 'cache_clear':
+                    clear()
+        barrier = threading.Barrier(8)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(work())
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        expected = work()
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(r == expected for r in results))
+
+    def test_no_shared_state(self):
+        a, b = Scale('C', 'major'), Scale('D', 'major')
+        a.intervals[1].semitones = 3
+        self.assertEqual(b.intervals[1].semitones, 2)
+        self.assertEqual(Scale('E', 'major').intervals[1].semitones, 2)
+        self.assertIsInstance(Chord._mask_table()[0b10010001], tuple)
+
+
+class TestsForEngines(unittest.TestCase):
+    def tearDown(self):
+        set_engine('accelerated')
+
+    def test_switch(self):
+        self.assertEqual(get_engine(), 'accelerated')
+        self.assertRaises(NameError, set_engine, 'fast')
+        for engine in ('reference', 'accelerated'):
+            set_engine(engine)
+            self.assertEqual(get_engine(), engine)
+            self.assertEqual(Note('C4') + Interval('M10'), Note('E5'))
+            self.assertEqual(Note('E5') - Interval('M10'), Note('C4'))
+            self.assertEqual(str(Note('E5') - Note('C4')), 'M10')
+            self.assertEqual(Chord('Bb7').notes, [Note('Bb4'), Note('D5'),
+                                                  Note('F5'), Note('Ab5')])
+            self.assertEqual(Chord('C/E').notes,
+                             [Note('E4'), Note('G4'), Note('C5')])
+            self.assertEqual(str(Scale('D', 'dorian').mode(2)), 'E phrygian')
+        # the subtraction goes through the octave below, with both engines
+        for engine in engines:
+            set_engine(engine)
+            self.assertRaises(ValueError, lambda: Note('D0') - Interval('M2'))
+            self.assertRaises(ValueError, lambda: Note('D1') - Interval('M9'))
+            self.assertEqual(Note('D1') - Interval('M2'), Note('C1'))
+
+    def test_verify(self):
+        set_engine('reference')
+        reports = verify(['note + interval', 'chords'])
+        self.assertEqual(get_engine(), 'reference')
+        self.assertEqual([r['case'] for r in reports],
+                         ['note + interval', 'chords'])
+        self.assertEqual(reports[1]['inputs'], 10 * 49 * len(Chord.recipes))
+        for report in reports:
+            self.assertEqual(report['mismatches'], [])
+        self.assertRaises(NameError, verify, ['everything'])
+
+
+class TestsForScaleIndex(unittest.TestCase):
+    def test_relationships(self):
+        index = ScaleIndex.shared()
+        self.assertIs(index, ScaleIndex.shared())
+        self.assertEqual([str(s) for s in index.relatives('C major')],
+                         ['A aeolian', 'A natural_minor', 'B locrian',
+                          'C ionian', 'D dorian', 'E phrygian', 'F lydian',
+                          'G mixolydian'])
+        self.assertIn('D# aeolian', [str(s) for s in
+                                     index.relatives(Scale('F#', 'major'))])
+        self.assertNotIn('Gb major', [str(s) for s in
+                                      index.relatives(Scale('F#', 'major'))])
+        parallels = [str(s) for s in index.parallels('A natural_minor')]
+        self.assertIn('A harmonic_minor', parallels)
+        self.assertIn('A major', parallels)
+        self.assertNotIn('A natural_minor', parallels)
+        self.assertEqual([str(s) for s in index.modes('D melodic_minor')][:3],
+                         ['D melodic_minor', 'E melodic_minor_mode2',
+                          'F melodic_minor_mode3'])
+        self.assertEqual(index.common('C major', 'A harmonic_minor'), 6)
+        self.assertEqual(index.common('C major', 'F# major'), 2)
+        neighbors = index.neighbors('C major', k=3)
+        self.assertEqual([shared for _, shared in neighbors], [7, 7, 7])
+        self.assertRaises(ValueError, index.relatives, 'B# major')
+
+    def test_names(self):
+        index = ScaleIndex(['major', 'natural_minor'])
+        self.assertEqual(len(index.scales), 2 * len(list(Note.all())))
+        self.assertEqual([str(s) for s in index.relatives('Eb major')],
+                         ['C natural_minor'])
+
+
 if __name__ == '__main__':
     unittest.main()